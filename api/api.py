@@ -1,13 +1,24 @@
-from fastapi import FastAPI, Query, HTTPException
+from fastapi import FastAPI, Query, HTTPException, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from typing import List, Optional
 import pandas as pd
 import numpy as np
 from datetime import datetime, date
-from pydantic import BaseModel
-import pickle
+from pydantic import BaseModel, Field
 import os
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from place_store import PlaceStore, SORT_FIELDS
+from filter_index import FilterIndex
+from content_index import ContentIndex
+from personalization import UserFeatureBuilder
+from model_bundle import load_artifacts
+from user_rankings import RANKINGS_FILENAME, UserRankings, build_user_rankings, model_fingerprint
+from serialization import (
+    frame_to_columns, records_to_columns, recommendations_response, json_response, batch_response,
+    export_chunks, RESPONSE_FIELDS, EXPORT_MEDIA_TYPES,
+)
+from executor import BoundedExecutor, OverloadedError
+from geo import PlaceCoordinates
+from result_cache import ResultCache, recommendation_key, catalog_key, normalize_text, normalize_interests
 
 app = FastAPI(
     title="ExploreIndonesia API",
@@ -18,6 +29,31 @@ app = FastAPI(
 # Global variables untuk model dan data
 model_artifacts = None
 loaded = False
+place_index = None  # FilterIndex over model_artifacts["places_df"]
+content_index = None  # ContentIndex (TF-IDF) over model_artifacts["places_df"]
+user_features = None  # UserFeatureBuilder for personalized LTR scoring
+user_rankings = None  # UserRankings: precomputed best-first places per known user
+place_coordinates = None  # PlaceCoordinates (radians) aligned with model_artifacts["places_df"]
+model_version = 0  # bumped on every successful model load; part of the result cache generation
+
+# Places CSV kept in memory; reloaded only when the file changes
+place_store = PlaceStore(os.path.join(os.path.dirname(__file__), "data", "tourism_with_id.csv"))
+
+# Bounded thread pool for scoring so blocking pandas/sklearn work stays off the event loop
+executor = BoundedExecutor.from_env()
+
+# Serialized responses of general recommendation queries (LRU + TTL)
+result_cache = ResultCache.from_env()
+
+# Distance-decay term of the composite score (only used when the user's origin is given)
+DISTANCE_WEIGHT = 0.3
+DEFAULT_HALF_LIFE_KM = float(os.getenv("API_DISTANCE_HALF_LIFE_KM", "10"))
+
+# Maximum number of queries in one POST /recommendations/batch
+MAX_BATCH_SIZE = int(os.getenv("API_BATCH_MAX_QUERIES", "5000"))
+
+# Places encoded per chunk of the streaming catalog export
+EXPORT_CHUNK_SIZE = 500
 
 class Destination(BaseModel):
     destination: str
@@ -52,6 +88,9 @@ class TourismRecommendationResponse(BaseModel):
     score: float
     price_category: str
 
+class NearbyPlaceResponse(TourismRecommendationResponse):
+    distance_km: float
+
 class RecommendationRequest(BaseModel):
     location: Optional[str] = None
     min_rating: Optional[float] = None
@@ -59,148 +98,154 @@ class RecommendationRequest(BaseModel):
     category: Optional[str] = None
     interests: Optional[List[str]] = None  # Keyword interests for content-based filtering
     top_n: int = 10
+    lat: Optional[float] = Field(None, ge=-90.0, le=90.0)  # User origin for distance-aware ranking (together with lon)
+    lon: Optional[float] = Field(None, ge=-180.0, le=180.0)
+    half_life_km: Optional[float] = Field(None, gt=0, le=2000)  # Distance at which the distance score halves
+
+class BatchRecommendationQuery(RecommendationRequest):
+    user_id: Optional[int] = None  # Known user: personalized ranking (interests/lat/lon are ignored)
 
 def load_ml_model():
     """Load the ML model and artifacts"""
-    global model_artifacts, loaded
+    global model_artifacts, loaded, place_index, content_index, user_features, user_rankings, model_version
+    global place_coordinates
     
     try:
-        model_path = os.path.join(os.path.dirname(__file__), "model", "recommendation_artifacts_optimal.pkl")
+        model_dir = os.path.join(os.path.dirname(__file__), "model")
         
-        if not os.path.exists(model_path):
-            print(f"Model file not found at: {model_path}")
+        # Versioned bundle (memory-mapped) if present, legacy pickle otherwise
+        artifacts, model_path = load_artifacts(model_dir)
+        if artifacts is None:
+            print(f"No model bundle or pickle found in: {model_dir}")
             return False
-            
-        with open(model_path, "rb") as f:
-            model_artifacts = pickle.load(f)
+        
+        model_artifacts = artifacts
+        
+        place_index = FilterIndex.from_frame(model_artifacts["places_df"], {
+            'city': 'City_name',
+            'category': 'Category_name',
+            'price_category': 'price_category',
+        })
+        content_index = ContentIndex.from_frame(model_artifacts["places_df"])
+        place_coordinates = load_place_coordinates(model_artifacts["places_df"])
+        
+        # Personalization is optional: if it fails, only personalized recommendations are disabled
+        try:
+            user_features = UserFeatureBuilder(model_artifacts)
+            user_rankings = load_user_rankings(model_path)
+        except Exception as e:
+            print(f"Error loading personalization; personalized recommendations disabled: {e}")
+            user_features, user_rankings = None, None
         
         loaded = True
-        print("ML model loaded successfully!")
+        model_version += 1
+        print(f"ML model loaded successfully from {model_path}")
         return True
     except Exception as e:
         print(f"Error loading ML model: {e}")
         return False
 
-def create_feature_matrix_for_user(user_id, places_list, artifacts):
-    """Create feature matrix for a specific user and places"""
-    places_df = artifacts["places_df"]
-    users_df = artifacts["users_df"]
-    
-    if user_id not in users_df['User_Id'].values:
-        return None, None
-    
-    user_age = users_df[users_df['User_Id'] == user_id]['Age'].iloc[0]
-    places_indexed = places_df.set_index('Place_Id')
-    
-    # Create TF-IDF features (simplified for API)
-    tfidf = TfidfVectorizer(max_features=100)
-    tfidf_matrix = tfidf.fit_transform(places_df['Description'].fillna(""))
-    
-    # Mock content scores and collaborative filtering scores for API usage
-    feature_rows = []
-    for p_id in places_list:
-        if p_id in places_indexed.index:
-            place_features = places_indexed.loc[p_id]
-            
-            # Simple feature engineering for API
-            price_bins = [-1, 25000, 100000, np.inf]
-            price_labels = ['murah', 'menengah', 'mahal']
-            price_cat = pd.cut([place_features['Price']], bins=price_bins, labels=price_labels)[0]
-            
-            age_price_feature = 1.0  # Default interaction
-            if user_age < 25 and price_cat == 'mahal':
-                age_price_feature = 0.0
-            elif user_age > 40 and price_cat == 'murah':
-                age_price_feature = 0.5
-            
-            features = [
-                0.5,  # content_score (mock)
-                0.5,  # user_cf_score (mock)  
-                0.5,  # item_cf_score (mock)
-                user_age,
-                place_features['Rating'],
-                place_features['Price'],
-                place_features['Category'],
-                place_features['City'],
-                age_price_feature
-            ]
-            feature_rows.append(features)
-    
-    return np.array(feature_rows), places_list
-
-def recommend_places_general(location=None, min_rating=None, price_cat=None, category_name=None, interests=None, top_n=10):
-    """General recommendation system without user dependency"""
+def load_user_rankings(model_path):
+    """Load the precomputed per-user rankings, rebuilding them if missing or stale"""
+    rankings_path = os.path.join(os.path.dirname(model_path), RANKINGS_FILENAME)
+    fingerprint = model_fingerprint(model_path)
+    
+    if os.path.exists(rankings_path):
+        try:
+            rankings = UserRankings.load(rankings_path)
+            if rankings.fingerprint == fingerprint:
+                return rankings
+            print(f"User rankings at {rankings_path} are stale, rebuilding")
+        except Exception as e:
+            print(f"Error loading user rankings: {e}")
+    
+    ratings_df = model_artifacts.get("ratings_df")
+    if ratings_df is None:
+        print("Model artifacts have no ratings_df; already rated places will not be excluded")
+    
+    return build_user_rankings(user_features, ratings_df, fingerprint=fingerprint)
+
+def load_place_coordinates(places_df):
+    """Coordinates of the model's places from the places CSV (places_df has no Lat/Long), or None"""
+    try:
+        coords_df = pd.read_csv(place_store.csv_path, usecols=['Place_Id', 'Lat', 'Long'])
+        return PlaceCoordinates.from_frames(places_df, coords_df)
+    except Exception as e:
+        print(f"Error loading place coordinates; distance-aware ranking disabled: {e}")
+        return None
+
+def filter_place_positions(location=None, min_rating=None, price_cat=None, category_name=None):
+    """Row positions in places_df matching the filters, via the shared filter index"""
+    return place_index.candidates(
+        {'city': location, 'price_category': price_cat, 'category': category_name},
+        min_rating=min_rating,
+    )
+
+def recommend_places_general(location=None, min_rating=None, price_cat=None, category_name=None, interests=None, top_n=10,
+                             origin=None, half_life_km=DEFAULT_HALF_LIFE_KM, positions=None):
+    """General recommendation system without user dependency; returns the top-N rows of places_df
+    
+    With ``origin`` (lat, lon in degrees) the composite score gets a distance-decay
+    term that halves every ``half_life_km``, computed in one pass over the candidates.
+    ``positions`` are the already filtered candidate rows, if the caller has them.
+    """
     global model_artifacts, loaded
     
     if not loaded or model_artifacts is None:
-        return []
+        return pd.DataFrame()
     
     try:
-        places_df = model_artifacts["places_df"].copy()
+        # Apply basic filters through the inverted index; only candidate rows are copied
+        if positions is None:
+            positions = filter_place_positions(location, min_rating, price_cat, category_name)
+        if len(positions) == 0:
+            return pd.DataFrame()
         
-        # Apply basic filters
-        if location:
-            places_df = places_df[places_df['City_name'] == location]
-        if min_rating is not None:
-            places_df = places_df[places_df['Rating'] >= min_rating]
-        if price_cat is not None:
-            places_df = places_df[places_df['price_category'] == price_cat]
-        if category_name is not None:
-            places_df = places_df[places_df['Category_name'] == category_name]
+        places_df = model_artifacts["places_df"].iloc[positions].copy()
         
-        if places_df.empty:
-            return []
+        # Distance decay from the user's origin over all candidates at once
+        if origin is not None and place_coordinates is not None:
+            places_df['distance_score'] = place_coordinates.decay(origin[0], origin[1], half_life_km, positions)
         
         # Content-based filtering if interests are provided
         if interests and len(interests) > 0:
-            places_df = content_based_filtering(places_df, interests)
+            places_df = content_based_filtering(places_df, interests, positions)
         
         # Calculate composite score: Rating + Popularity + Content similarity (if applicable)
         places_df['popularity_score'] = places_df['Rating'] / 5.0  # Normalize rating to 0-1
         
         # Add price preference score (cheaper places get higher score for general users)
         price_score_map = {'murah': 1.0, 'menengah': 0.7, 'mahal': 0.4}
-        places_df['price_score'] = places_df['price_category'].map(price_score_map).fillna(0.5)
+        places_df['price_score'] = places_df['price_category'].astype(str).map(price_score_map).fillna(0.5)
         
         # Final composite score
         places_df['final_score'] = (
             places_df['popularity_score'] * 0.6 +  # Rating weight
             places_df['price_score'] * 0.2 +       # Price preference weight
-            places_df.get('content_score', 0) * 0.2  # Content similarity weight (if available)
+            places_df.get('content_score', 0) * 0.2 +  # Content similarity weight (if available)
+            places_df.get('distance_score', 0) * DISTANCE_WEIGHT  # Proximity to the user (if origin given)
         )
         
         # Sort and return top N
         result = places_df.nlargest(top_n, 'final_score')
         result['score'] = result['final_score']
         
-        return result.to_dict('records')
+        return result
         
     except Exception as e:
         print(f"Error in general recommendation: {e}")
-        # Fallback to simple rating-based recommendation
-        return recommend_popular_places(location, min_rating, price_cat, category_name, top_n)
+        # Fallback to simple rating-based recommendation over the same candidates
+        return recommend_popular_places(location, min_rating, price_cat, category_name, top_n, positions=positions)
 
-def content_based_filtering(places_df, interests):
-    """Filter places based on content similarity with user interests"""
+def content_based_filtering(places_df, interests, positions):
+    """Filter places based on content similarity with user interests
+    
+    ``positions`` are the rows of places_df within the full places table; only
+    those rows of the precomputed TF-IDF matrix are scored.
+    """
     try:
-        # Combine interests into a single query
-        user_query = " ".join(interests).lower()
-        
-        # Create TF-IDF vectorizer
-        tfidf = TfidfVectorizer(max_features=500, stop_words=None)
-        
-        # Prepare descriptions for TF-IDF
-        descriptions = places_df['Description'].fillna("").str.lower()
-        all_texts = descriptions.tolist() + [user_query]
-        
-        # Fit TF-IDF and calculate similarities
-        tfidf_matrix = tfidf.fit_transform(all_texts)
-        
-        # Calculate cosine similarity between user query and all places
-        user_tfidf = tfidf_matrix[-1:]  # Last item is user query
-        place_tfidf = tfidf_matrix[:-1]  # All except last are place descriptions
-        
-        similarities = cosine_similarity(user_tfidf, place_tfidf).flatten()
+        # Transform the query with the fitted vocabulary and score candidate rows
+        similarities = content_index.similarities(interests, positions)
         
         # Add content score to DataFrame
         places_df = places_df.copy()
@@ -218,36 +263,48 @@ def content_based_filtering(places_df, interests):
         places_df['content_score'] = 0.5  # Neutral score
         return places_df
 
-def recommend_popular_places(user_location=None, min_rating=None, price_cat=None, category_name=None, top_n=10):
-    """Fallback recommendation based on popularity"""
-    global model_artifacts
+def recommend_places_for_user(user_id, location=None, min_rating=None, price_cat=None, category_name=None, top_n=10,
+                              candidate_mask=None):
+    """Personalized recommendations from the user's precomputed LTR ranking
     
-    if model_artifacts is None:
-        return []
+    Returns None for unknown users, otherwise the top-N rows of places_df
+    (already rated places excluded) with the LTR score in 'score'.
+    ``candidate_mask`` is the already computed filter mask, if the caller has it.
+    """
+    if user_rankings is None or user_id not in user_rankings:
+        return None
     
     places_df = model_artifacts["places_df"]
-    candidate_places = places_df.copy()
+    if candidate_mask is None:
+        candidate_mask = np.zeros(len(places_df), dtype=bool)
+        candidate_mask[filter_place_positions(location, min_rating, price_cat, category_name)] = True
     
-    # Apply filters
-    if user_location:
-        candidate_places = candidate_places[candidate_places['City_name'] == user_location]
-    if min_rating is not None:
-        candidate_places = candidate_places[candidate_places['Rating'] >= min_rating]
-    if price_cat is not None:
-        candidate_places = candidate_places[candidate_places['price_category'] == price_cat]
-    if category_name is not None:
-        candidate_places = candidate_places[candidate_places['Category_name'] == category_name]
+    positions, scores = user_rankings.top(user_id, candidate_mask, top_n)
+    result = places_df.iloc[positions].copy()
+    result['score'] = scores
+    
+    return result
+
+def recommend_popular_places(user_location=None, min_rating=None, price_cat=None, category_name=None, top_n=10,
+                             positions=None):
+    """Fallback recommendation based on popularity (``positions`` are the already filtered rows, if known)"""
+    global model_artifacts
     
-    if candidate_places.empty:
-        return []
+    if model_artifacts is None:
+        return pd.DataFrame()
+    
+    if positions is None:
+        positions = filter_place_positions(user_location, min_rating, price_cat, category_name)
+    if len(positions) == 0:
+        return pd.DataFrame()
     
-    # Sort by rating and return top N
-    results = candidate_places.sort_values('Rating', ascending=False).head(top_n)
+    # Walk the precomputed rating order and return top N
+    results = model_artifacts["places_df"].iloc[place_index.top_k(positions, top_n)].copy()
     
     # Add mock score
     results['score'] = results['Rating']
     
-    return results.to_dict('records')
+    return results
 
 def load_tourism_data():
     destinations = [
@@ -359,13 +416,34 @@ def get_fallback_recommendations(location=None, min_rating=None, price_category=
 
 @app.on_event("startup")
 async def startup_event():
-    """Load ML model on startup"""
+    """Load ML model and place data on startup
+    
+    Under gunicorn with preload_app (see gunicorn.conf.py) both are already
+    loaded in the master process and shared with the forked workers.
+    """
+    place_store.load()
+    if loaded:
+        return
     try:
         load_ml_model()
     except Exception as e:
         print(f"Failed to load ML model: {e}")
         print("Running in fallback mode with dummy data")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    executor.shutdown()
+
+@app.exception_handler(OverloadedError)
+async def overloaded_handler(request, exc):
+    """Shed load with 503 instead of queueing more scoring work"""
+    print(f"Rejecting request, executor full: {exc}")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server sedang sibuk, silakan coba lagi"},
+        headers={"Retry-After": "1"},
+    )
+
 @app.get("/")
 async def root():
     return {
@@ -375,66 +453,59 @@ async def root():
         "ml_model_loaded": loaded
     }
 
+# Response headers stored with cached bodies
+CACHED_HEADERS = ("X-Total-Count",)
+
+async def cache_generation():
+    """Current data generation for the result cache; picks up CSV changes off the event loop"""
+    if place_store.check_due():
+        await executor.run(place_store.get)
+    generation = (place_store.version, model_version)
+    result_cache.validate(generation)
+    return generation
+
+async def cached_recommendations(key, fn, *args):
+    """Serve a general recommendation query from the result cache, computing it on a miss"""
+    generation = await cache_generation()
+    cached = result_cache.get(key)
+    if cached is not None:
+        body, headers = cached
+        return json_response(body, headers={**headers, "X-Cache": "HIT"})
+    
+    response = await executor.run(fn, *args)
+    # Only successful serialized responses are cached (not the dummy fallback or errors)
+    if isinstance(response, Response) and response.status_code == 200:
+        headers = {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers}
+        result_cache.put(key, response.body, generation, headers)
+        response.headers["X-Cache"] = "MISS"
+    return response
+
 def load_csv_data():
-    """Load tourism data directly from CSV"""
-    try:
-        csv_path = "data/tourism_with_id.csv"
-        if os.path.exists(csv_path):
-            df = pd.read_csv(csv_path)
-            return df
-        else:
-            print(f"CSV file not found at: {csv_path}")
-            return None
-    except Exception as e:
-        print(f"Error loading CSV data: {e}")
-        return None
+    """Return the in-memory place table (reloaded by the store if the CSV changed)"""
+    return place_store.get()
 
 def get_csv_recommendations(location=None, min_rating=None, price_category=None, category=None, top_n=10):
-    """Get recommendations directly from CSV data"""
-    df = load_csv_data()
-    if df is None:
-        return get_fallback_recommendations(location, min_rating, price_category, category, top_n)
-    
-    # Filter data
-    filtered_df = df.copy()
-    
-    if location:
-        filtered_df = filtered_df[filtered_df['City'].str.contains(location, case=False, na=False)]
-    
-    if min_rating:
-        filtered_df = filtered_df[filtered_df['Rating'] >= min_rating]
-    
-    if category:
-        filtered_df = filtered_df[filtered_df['Category'].str.contains(category, case=False, na=False)]
+    """Get recommendations from the preloaded CSV data as response columns"""
+    places = load_csv_data()
+    if places is None:
+        return records_to_columns(get_fallback_recommendations(location, min_rating, price_category, category, top_n))
     
-    # Add price category logic
-    if price_category:
-        if price_category.lower() == "murah":
-            filtered_df = filtered_df[filtered_df['Price'] <= 50000]
-        elif price_category.lower() == "menengah":
-            filtered_df = filtered_df[(filtered_df['Price'] > 50000) & (filtered_df['Price'] <= 200000)]
-        elif price_category.lower() == "mahal":
-            filtered_df = filtered_df[filtered_df['Price'] > 200000]
-    
-    # Sort by rating and get top N
-    filtered_df = filtered_df.sort_values('Rating', ascending=False).head(top_n)
+    # Filter on precomputed keys and take the highest rated places
+    positions = places.filter(location, min_rating, price_category, category)
+    positions = places.top_by_rating(positions, top_n)
     
-    # Convert to response format
-    recommendations = []
-    for _, row in filtered_df.iterrows():
-        recommendations.append({
-            "Place_Id": int(row['Place_Id']),
-            "Place_Name": str(row['Place_Name']),
-            "Description": str(row['Description'])[:200] + "..." if len(str(row['Description'])) > 200 else str(row['Description']),
-            "Category": str(row['Category']),
-            "City": str(row['City']),
-            "Price": int(row['Price']) if pd.notna(row['Price']) else 0,
-            "Rating": float(row['Rating']) if pd.notna(row['Rating']) else 0.0,
-            "score": float(row['Rating']) if pd.notna(row['Rating']) else 0.0,
-            "price_category": "murah" if row['Price'] <= 50000 else ("menengah" if row['Price'] <= 200000 else "mahal")
-        })
+    return places.columns(positions)
+
+def get_csv_page(location=None, min_rating=None, price_category=None, category=None,
+                 sort_by='rating', descending=True, offset=0, limit=10):
+    """One sorted page of the filtered CSV places as (response columns, total matches), or None without CSV"""
+    places = load_csv_data()
+    if places is None:
+        return None
     
-    return recommendations
+    positions = places.filter(location, min_rating, price_category, category)
+    page = places.page(positions, sort_by, descending, offset, limit)
+    return places.columns(page), len(positions)
 
 @app.get("/recommendations", response_model=List[TourismRecommendationResponse])
 async def get_recommendations(
@@ -443,31 +514,81 @@ async def get_recommendations(
     price_category: Optional[str] = Query(None, description="Kategori harga (murah/menengah/mahal)"),
     category: Optional[str] = Query(None, description="Kategori wisata (Budaya, Taman Hiburan, Cagar Alam, Bahari, Pusat Perbelanjaan, Tempat Ibadah)"),
     interests: Optional[str] = Query(None, description="Minat/kata kunci yang dicari (pisahkan dengan koma)"),
-    top_n: int = Query(10, ge=1, le=50, description="Jumlah rekomendasi")
+    top_n: int = Query(10, ge=1, le=50, description="Jumlah rekomendasi"),
+    sort_by: Optional[str] = Query(None, pattern="^(rating|name|price)$", description="Urutkan katalog: rating, name, atau price (mengaktifkan paginasi)"),
+    order: Optional[str] = Query(None, pattern="^(asc|desc)$", description="Arah urutan (default: rating desc, name/price asc)"),
+    offset: int = Query(0, ge=0, description="Lewati sejumlah hasil (paginasi)"),
+    limit: Optional[int] = Query(None, ge=1, le=100, description="Ukuran halaman (paginasi, menggantikan top_n)"),
+    lat: Optional[float] = Query(None, ge=-90.0, le=90.0, description="Latitude lokasi user (peringkat memperhitungkan jarak)"),
+    lon: Optional[float] = Query(None, ge=-180.0, le=180.0, description="Longitude lokasi user (peringkat memperhitungkan jarak)"),
+    half_life_km: Optional[float] = Query(None, gt=0, le=2000, description="Jarak (km) saat skor jarak turun setengah")
 ):
     """
-    Endpoint untuk mendapatkan rekomendasi wisata general (tanpa user_id)
+    Endpoint untuk mendapatkan rekomendasi wisata general (tanpa user_id).
+    
+    Dengan sort_by/order/offset/limit, endpoint mengembalikan satu halaman katalog
+    yang sudah terurut (tanpa batas 50) dan total hasil di header X-Total-Count;
+    paginasi tidak bisa digabung dengan interests atau lat/lon.
+    Dengan lat/lon, skor komposit mendapat komponen peluruhan jarak dari lokasi user.
     """
-    # Try CSV data first, fallback to ML model if available, then dummy data
-    try:
-        recommendations = get_csv_recommendations(location, min_rating, price_category, category, top_n)
-        if recommendations:
-            response = []
-            for rec in recommendations:
-                response.append(TourismRecommendationResponse(
-                    Place_Id=rec['Place_Id'],
-                    Place_Name=rec['Place_Name'],
-                    Description=rec['Description'],
-                    Category=rec['Category'],
-                    City=rec['City'],
-                    Price=rec['Price'],
-                    Rating=rec['Rating'],
-                    score=rec['score'],
-                    price_category=rec['price_category']
-                ))
-            return response
-    except Exception as e:
-        print(f"Error with CSV recommendations: {e}")
+    location, price_category, category = normalize_text(location), normalize_text(price_category), normalize_text(category)
+    origin = request_origin(lat, lon)
+    if sort_by is not None or order is not None or offset or limit is not None:
+        if normalize_interests(interests) or origin is not None:
+            raise HTTPException(status_code=422, detail="Paginasi (sort_by/order/offset/limit) tidak bisa digabung dengan interests atau lat/lon")
+        sort_by = sort_by or 'rating'
+        descending = SORT_FIELDS[sort_by] if order is None else order == 'desc'
+        limit = limit or top_n
+        key = catalog_key(location, min_rating, price_category, category, sort_by, descending, offset, limit)
+        return await cached_recommendations(
+            key, catalog_page, location, min_rating, price_category, category, sort_by, descending, offset, limit
+        )
+    
+    half_life_km = DEFAULT_HALF_LIFE_KM if half_life_km is None else half_life_km
+    key = recommendation_key("GET", location, min_rating, price_category, category, interests, top_n, origin, half_life_km)
+    return await cached_recommendations(
+        key, general_recommendations, location, min_rating, price_category, category, interests, top_n,
+        origin, half_life_km
+    )
+
+def normalize_request(request):
+    """Copy of a POST/batch query with the same normalized filters and interests its cache key uses"""
+    return request.model_copy(update={
+        'location': normalize_text(request.location),
+        'price_category': normalize_text(request.price_category),
+        'category': normalize_text(request.category),
+        'interests': list(normalize_interests(request.interests)) or None,
+    })
+
+def request_origin(lat, lon):
+    """The user's origin as (lat, lon), or None; both coordinates must be given together"""
+    if lat is None and lon is None:
+        return None
+    if lat is None or lon is None:
+        raise HTTPException(status_code=422, detail="lat dan lon harus diisi bersamaan")
+    return (lat, lon)
+
+def catalog_page(location, min_rating, price_category, category, sort_by, descending, offset, limit):
+    """Blocking part of a paginated GET /recommendations, run on the executor"""
+    result = get_csv_page(location, min_rating, price_category, category, sort_by, descending, offset, limit)
+    if result is None:
+        raise HTTPException(status_code=503, detail="Data belum dimuat")
+    
+    columns, total = result
+    return recommendations_response(columns, headers={"X-Total-Count": str(total)})
+
+def general_recommendations(location, min_rating, price_category, category, interests, top_n,
+                            origin=None, half_life_km=DEFAULT_HALF_LIFE_KM):
+    """Blocking part of GET /recommendations, run on the executor"""
+    # Try CSV data first, fallback to ML model if available, then dummy data.
+    # Distance-aware queries need the composite score, so they go straight to the model when it is loaded.
+    if origin is None or not loaded:
+        try:
+            recommendations = get_csv_recommendations(location, min_rating, price_category, category, top_n)
+            if len(recommendations["Place_Id"]):
+                return recommendations_response(recommendations)
+        except Exception as e:
+            print(f"Error with CSV recommendations: {e}")
     
     if not loaded:
         # Fallback to dummy data
@@ -486,28 +607,16 @@ async def get_recommendations(
             price_cat=price_category,
             category_name=category,
             interests=interest_list,
-            top_n=top_n
+            top_n=top_n,
+            origin=origin,
+            half_life_km=half_life_km
         )
         
-        if not recommendations:
+        if recommendations.empty:
             raise HTTPException(status_code=404, detail="Tidak ada rekomendasi yang ditemukan dengan kriteria tersebut")
         
-        # Convert to response model
-        response = []
-        for rec in recommendations:
-            response.append(TourismRecommendationResponse(
-                Place_Id=rec['Place_Id'],
-                Place_Name=rec['Place_Name'],
-                Description=rec['Description'][:200] + "..." if len(rec['Description']) > 200 else rec['Description'],
-                Category=rec['Category_name'],
-                City=rec['City_name'],
-                Price=rec['Price'],
-                Rating=rec['Rating'],
-                score=float(rec['score']),
-                price_category=rec['price_category']
-            ))
-        
-        return response
+        # Serialize the top-N frame column-wise, bypassing per-row response models
+        return recommendations_response(frame_to_columns(recommendations))
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating recommendations: {str(e)}")
@@ -517,6 +626,18 @@ async def post_recommendations(request: RecommendationRequest):
     """
     Endpoint POST untuk mendapatkan rekomendasi wisata general
     """
+    request = normalize_request(request)
+    origin = request_origin(request.lat, request.lon)
+    half_life_km = DEFAULT_HALF_LIFE_KM if request.half_life_km is None else request.half_life_km
+    
+    key = recommendation_key(
+        "POST", request.location, request.min_rating, request.price_category,
+        request.category, request.interests, request.top_n, origin, half_life_km,
+    )
+    return await cached_recommendations(key, post_general_recommendations, request, origin, half_life_km)
+
+def post_general_recommendations(request, origin=None, half_life_km=DEFAULT_HALF_LIFE_KM):
+    """Blocking part of POST /recommendations, run on the executor"""
     if not loaded:
         # Fallback to dummy data
         print("Model not loaded, using fallback data")
@@ -529,32 +650,163 @@ async def post_recommendations(request: RecommendationRequest):
             price_cat=request.price_category,
             category_name=request.category,
             interests=request.interests,
-            top_n=request.top_n
+            top_n=request.top_n,
+            origin=origin,
+            half_life_km=half_life_km
         )
         
-        if not recommendations:
+        if recommendations.empty:
             raise HTTPException(status_code=404, detail="Tidak ada rekomendasi yang ditemukan dengan kriteria tersebut")
         
-        # Convert to response model
-        response = []
-        for rec in recommendations:
-            response.append(TourismRecommendationResponse(
-                Place_Id=rec['Place_Id'],
-                Place_Name=rec['Place_Name'],
-                Description=rec['Description'][:200] + "..." if len(rec['Description']) > 200 else rec['Description'],
-                Category=rec['Category_name'],
-                City=rec['City_name'],
-                Price=rec['Price'],
-                Rating=rec['Rating'],
-                score=float(rec['score']),
-                price_category=rec['price_category']
-            ))
-        
-        return response
+        # Serialize the top-N frame column-wise, bypassing per-row response models
+        return recommendations_response(frame_to_columns(recommendations))
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating recommendations: {str(e)}")
 
+@app.post("/recommendations/batch", response_model=List[List[TourismRecommendationResponse]])
+async def post_batch_recommendations(requests: List[BatchRecommendationQuery]):
+    """
+    Endpoint POST untuk banyak query rekomendasi sekaligus (mis. semua kota di homepage,
+    atau daftar personal ribuan user). Hasil dikembalikan berurutan sesuai query;
+    query tanpa hasil atau dengan user_id yang tidak dikenal mendapat list kosong.
+    """
+    if len(requests) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"Maksimal {MAX_BATCH_SIZE} query per batch")
+    if not loaded:
+        raise HTTPException(status_code=503, detail="Model belum dimuat")
+    
+    queries = []
+    for request in map(normalize_request, requests):
+        origin = request_origin(request.lat, request.lon)
+        half_life_km = DEFAULT_HALF_LIFE_KM if request.half_life_km is None else request.half_life_km
+        queries.append((request, origin, half_life_km))
+    
+    return await executor.run(batch_recommendations, queries)
+
+def batch_recommendations(queries):
+    """Blocking part of POST /recommendations/batch, run on the executor
+    
+    Filter lookups are shared between queries with the same filters, and
+    identical queries are scored only once.
+    """
+    n_places = len(model_artifacts["places_df"])
+    positions_by_filter, mask_by_filter, results_by_key = {}, {}, {}
+    results = []
+    
+    for request, origin, half_life_km in queries:
+        personalized = request.user_id is not None
+        if personalized:
+            key = ("USER", request.user_id, request.location, request.min_rating,
+                   request.price_category, request.category, request.top_n)
+        else:
+            key = recommendation_key(
+                "BATCH", request.location, request.min_rating, request.price_category,
+                request.category, request.interests, request.top_n, origin, half_life_km,
+            )
+        if key in results_by_key:
+            results.append(results_by_key[key])
+            continue
+        
+        filters = (request.location, request.min_rating, request.price_category, request.category)
+        if filters not in positions_by_filter:
+            positions_by_filter[filters] = filter_place_positions(
+                request.location, request.min_rating, request.price_category, request.category
+            )
+        positions = positions_by_filter[filters]
+        
+        if personalized:
+            if filters not in mask_by_filter:
+                mask_by_filter[filters] = np.zeros(n_places, dtype=bool)
+                mask_by_filter[filters][positions] = True
+            recommendations = recommend_places_for_user(
+                request.user_id, top_n=request.top_n, candidate_mask=mask_by_filter[filters]
+            )
+        else:
+            recommendations = recommend_places_general(
+                interests=request.interests,
+                top_n=request.top_n,
+                origin=origin,
+                half_life_km=half_life_km,
+                positions=positions
+            )
+        
+        columns = None
+        if recommendations is not None and not recommendations.empty:
+            columns = frame_to_columns(recommendations)
+        results_by_key[key] = columns
+        results.append(columns)
+    
+    return batch_response(results)
+
+@app.get("/users/{user_id}/recommendations", response_model=List[TourismRecommendationResponse])
+async def get_user_recommendations(
+    user_id: int,
+    location: Optional[str] = Query(None, description="Filter berdasarkan kota (Jakarta, Yogyakarta, Bandung, Semarang, Surabaya)"),
+    min_rating: Optional[float] = Query(None, ge=3.0, le=5.0, description="Rating minimal"),
+    price_category: Optional[str] = Query(None, description="Kategori harga (murah/menengah/mahal)"),
+    category: Optional[str] = Query(None, description="Kategori wisata (Budaya, Taman Hiburan, Cagar Alam, Bahari, Pusat Perbelanjaan, Tempat Ibadah)"),
+    top_n: int = Query(10, ge=1, le=50, description="Jumlah rekomendasi")
+):
+    """
+    Endpoint untuk rekomendasi wisata yang dipersonalisasi (user yang sudah dikenal model).
+    Tempat yang sudah pernah dinilai user tidak ikut direkomendasikan.
+    """
+    if not loaded or user_rankings is None:
+        raise HTTPException(status_code=503, detail="Model belum dimuat")
+    
+    recommendations = await executor.run(
+        recommend_places_for_user, user_id, location, min_rating, price_category, category, top_n
+    )
+    
+    if recommendations is None:
+        raise HTTPException(status_code=404, detail=f"User ID '{user_id}' tidak ditemukan")
+    if recommendations.empty:
+        raise HTTPException(status_code=404, detail="Tidak ada rekomendasi yang ditemukan dengan kriteria tersebut")
+    
+    return recommendations_response(frame_to_columns(recommendations))
+
+@app.get("/nearby", response_model=List[NearbyPlaceResponse])
+async def get_nearby(
+    lat: float = Query(..., ge=-90.0, le=90.0, description="Latitude lokasi user"),
+    lon: float = Query(..., ge=-180.0, le=180.0, description="Longitude lokasi user"),
+    radius_km: Optional[float] = Query(None, gt=0, le=2000, description="Radius pencarian (km)"),
+    k: int = Query(10, ge=1, le=50, description="Jumlah tempat terdekat"),
+    min_rating: Optional[float] = Query(None, ge=3.0, le=5.0, description="Rating minimal"),
+    price_category: Optional[str] = Query(None, description="Kategori harga (murah/menengah/mahal)"),
+    category: Optional[str] = Query(None, description="Kategori wisata (Budaya, Taman Hiburan, Cagar Alam, Bahari, Pusat Perbelanjaan, Tempat Ibadah)")
+):
+    """
+    Endpoint untuk destinasi terdekat dari sebuah titik (jarak Haversine), terurut dari yang terdekat.
+    Bisa dikombinasikan dengan filter rating, harga, dan kategori.
+    """
+    return await executor.run(nearby_places, lat, lon, radius_km, k, min_rating, price_category, category)
+
+def nearby_places(lat, lon, radius_km, k, min_rating, price_category, category):
+    """Blocking part of GET /nearby, run on the executor"""
+    places = load_csv_data()
+    if places is None:
+        raise HTTPException(status_code=503, detail="Data belum dimuat")
+    
+    candidates = places.filter(None, min_rating, price_category, category)
+    positions, distances = places.nearest(lat, lon, k, radius_km, candidates)
+    if len(positions) == 0:
+        raise HTTPException(status_code=404, detail="Tidak ada destinasi yang ditemukan di sekitar lokasi tersebut")
+    
+    columns = places.columns(positions)
+    columns["distance_km"] = np.round(distances, 3)
+    return recommendations_response(columns)
+
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Counter untuk monitoring: result cache (hit/miss) dan antrian executor
+    """
+    return {
+        "cache": result_cache.stats(),
+        "executor": executor.stats(),
+    }
+
 @app.get("/places")
 async def get_places(
     city: Optional[str] = Query(None, description="Filter berdasarkan kota"),
@@ -578,6 +830,53 @@ async def get_places(
     
     return places_df.to_dict('records')
 
+@app.get("/places/export")
+async def export_places(
+    fmt: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$", description="Format output: ndjson atau csv"),
+    fields: Optional[str] = Query(None, description=f"Kolom yang diambil, pisahkan dengan koma ({', '.join(RESPONSE_FIELDS)})"),
+    location: Optional[str] = Query(None, description="Filter berdasarkan kota"),
+    min_rating: Optional[float] = Query(None, ge=3.0, le=5.0, description="Rating minimal"),
+    price_category: Optional[str] = Query(None, description="Kategori harga (murah/menengah/mahal)"),
+    category: Optional[str] = Query(None, description="Kategori wisata"),
+    sort_by: str = Query("rating", pattern="^(rating|name|price)$", description="Urutkan: rating, name, atau price"),
+    order: Optional[str] = Query(None, pattern="^(asc|desc)$", description="Arah urutan (default: rating desc, name/price asc)")
+):
+    """
+    Endpoint untuk mengekspor seluruh katalog tempat (dengan skor) sebagai stream NDJSON atau CSV.
+    Data dikirim per potongan, sehingga memori server tetap kecil berapa pun ukuran katalog.
+    """
+    if fields:
+        selected = [field.strip() for field in fields.split(',') if field.strip()]
+        if not selected:
+            raise HTTPException(status_code=422, detail="Tidak ada kolom yang diberikan")
+        unknown = [field for field in selected if field not in RESPONSE_FIELDS]
+        if unknown:
+            raise HTTPException(status_code=422, detail=f"Kolom tidak dikenal: {', '.join(unknown)}")
+    else:
+        selected = RESPONSE_FIELDS
+    
+    places = await executor.run(load_csv_data)
+    if places is None:
+        raise HTTPException(status_code=503, detail="Data belum dimuat")
+    
+    descending = SORT_FIELDS[sort_by] if order is None else order == 'desc'
+    positions = places.filter(location, min_rating, price_category, category)
+    positions = places.page(positions, sort_by, descending, 0, len(positions))
+    
+    return StreamingResponse(
+        export_chunks(export_column_chunks(places, positions), selected, fmt),
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={
+            "X-Total-Count": str(len(positions)),
+            "Content-Disposition": f'attachment; filename="places.{fmt}"',
+        },
+    )
+
+def export_column_chunks(places, positions, chunk_size=EXPORT_CHUNK_SIZE):
+    """Response columns of a place table, EXPORT_CHUNK_SIZE rows at a time"""
+    for start in range(0, len(positions), chunk_size):
+        yield places.columns(positions[start:start + chunk_size])
+
 @app.get("/destinations", response_model=List[Destination])
 async def get_destinations(
     region: Optional[str] = Query(None, description="Filter by region"),
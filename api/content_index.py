@@ -0,0 +1,39 @@
+"""
+TF-IDF content index over place descriptions.
+
+The vectorizer vocabulary and the place matrix are fitted once when the model
+is loaded. Rows of the matrix are L2-normalized (the TfidfVectorizer default),
+so cosine similarity against a query is a single sparse dot product.
+"""
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+
+class ContentIndex:
+    """Fitted TF-IDF vocabulary plus the normalized place description matrix"""
+
+    def __init__(self, descriptions, max_features=500):
+        texts = [str(text).lower() for text in descriptions]
+        self.vectorizer = TfidfVectorizer(max_features=max_features)
+        self.matrix = self.vectorizer.fit_transform(texts).tocsr()
+
+    @classmethod
+    def from_frame(cls, df, column='Description', max_features=500):
+        """Build an index from a places frame"""
+        return cls(df[column].fillna(""), max_features=max_features)
+
+    def similarities(self, interests, positions=None):
+        """
+        Cosine similarity between the interests query and places.
+
+        Args:
+            interests (list): keywords, joined into a single query
+            positions (array-like): optional row positions to score (defaults to all rows)
+
+        Returns:
+            np.ndarray: one similarity per scored row
+        """
+        query = self.vectorizer.transform([" ".join(interests).lower()])
+        rows = self.matrix if positions is None else self.matrix[positions]
+        return np.asarray((rows @ query.T).todense()).ravel()
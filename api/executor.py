@@ -0,0 +1,94 @@
+"""
+Bounded execution layer for blocking recommendation work.
+
+Handlers are ``async def``, but scoring runs synchronous pandas, NumPy,
+sklearn and LightGBM code. Running it on the event loop stalls every other
+request, so handlers hand it to a fixed thread pool instead. NumPy, sparse
+products and LightGBM release the GIL for the heavy parts, and threads share
+the preloaded model without copying it.
+
+Admission is bounded: at most ``max_workers`` calls run and at most
+``max_queue`` more wait for a thread. Anything beyond that is rejected
+immediately with ``OverloadedError`` (served as 503) instead of queueing up
+and dragging every response's latency down with it.
+"""
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class OverloadedError(RuntimeError):
+    """Raised when the executor's queue is full"""
+
+
+class BoundedExecutor:
+    """Thread pool with a hard limit on running + queued calls"""
+
+    def __init__(self, max_workers=4, max_queue=16, thread_name_prefix="scoring"):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        # Threads are started lazily on first submit, i.e. after gunicorn has forked
+        self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix=thread_name_prefix) if max_workers > 0 else None
+
+    @classmethod
+    def from_env(cls):
+        """Sized from API_EXECUTOR_THREADS / API_EXECUTOR_QUEUE (0 threads = run inline on the loop)"""
+        threads = int(os.getenv("API_EXECUTOR_THREADS", min(4, os.cpu_count() or 1)))
+        queue = int(os.getenv("API_EXECUTOR_QUEUE", 4 * max(threads, 1)))
+        return cls(threads, queue)
+
+    @property
+    def capacity(self):
+        return self.max_workers + self.max_queue
+
+    def _release(self, _future=None):
+        with self._lock:
+            self.in_flight -= 1
+            self.completed += 1
+
+    async def run(self, fn, *args, **kwargs):
+        """
+        Run ``fn(*args, **kwargs)`` on the pool and await its result.
+
+        Raises:
+            OverloadedError: if max_workers calls are running and max_queue are already waiting
+        """
+        if self._pool is None:
+            return fn(*args, **kwargs)
+
+        with self._lock:
+            if self.in_flight >= self.capacity:
+                self.rejected += 1
+                raise OverloadedError(f"{self.in_flight} requests already in flight")
+            self.in_flight += 1
+
+        # The slot is freed when the work itself finishes, not when the awaiting
+        # request goes away, so disconnected clients can't overfill the pool
+        try:
+            future = self._pool.submit(functools.partial(fn, *args, **kwargs))
+        except RuntimeError:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,122 @@
+"""
+Inverted filter indexes over the places table.
+
+Each filterable column maps its values to a sorted array of row positions,
+and the rows are kept in a precomputed rating order. A filtered query is then
+an intersection of a few small sorted arrays followed by a walk down the
+rating order, instead of boolean masks over (and copies of) the full frame.
+Additional sort keys (name, price, ...) get their own presorted orders so a
+sorted page of a filtered result never sorts at request time.
+"""
+
+import numpy as np
+
+EMPTY_POSITIONS = np.empty(0, dtype=np.int64)
+
+
+class FilterIndex:
+    """Value -> row-position postings plus presorted row orders"""
+
+    def __init__(self, columns, rating, sort_keys=None):
+        """
+        Args:
+            columns (dict): field name -> sequence of values, one per row
+            rating (array-like): rating per row, used for ordering and min_rating
+            sort_keys (dict): optional extra sort name -> sequence of values, one per row
+        """
+        self.rating = np.asarray(rating, dtype=np.float64)
+        self.size = len(self.rating)
+        self.postings = {field: self._build_postings(values) for field, values in columns.items()}
+        self.orders = {}
+        for name, values in {'rating': self.rating, **(sort_keys or {})}.items():
+            self.orders[(name, False)], self.orders[(name, True)] = self._build_orders(values)
+
+    @classmethod
+    def from_frame(cls, df, fields, rating_column='Rating'):
+        """Build an index from a DataFrame given a {field: column} mapping"""
+        columns = {field: df[column].astype(str).to_numpy() for field, column in fields.items()}
+        return cls(columns, df[rating_column].fillna(0.0).to_numpy())
+
+    @staticmethod
+    def _build_postings(values):
+        values = np.asarray(values)
+        order = np.argsort(values, kind='stable')
+        sorted_values = values[order]
+        keys, starts = np.unique(sorted_values, return_index=True)
+        bounds = list(starts) + [len(values)]
+        # Positions inside each bucket are already ascending thanks to the stable sort
+        return {
+            key: order[bounds[i]:bounds[i + 1]].astype(np.int64)
+            for i, key in enumerate(keys.tolist())
+        }
+
+    def lookup(self, field, value, substring=False):
+        """Sorted positions for one field value (case-insensitive substring match if requested)"""
+        postings = self.postings[field]
+        if not substring:
+            return postings.get(value, EMPTY_POSITIONS)
+
+        query = value.lower()
+        matches = [positions for key, positions in postings.items() if query in key.lower()]
+        if not matches:
+            return EMPTY_POSITIONS
+        if len(matches) == 1:
+            return matches[0]
+        return np.unique(np.concatenate(matches))
+
+    @staticmethod
+    def _build_orders(values):
+        """Ascending and descending row orders; ties keep row order in both directions"""
+        _, ranks = np.unique(np.asarray(values), return_inverse=True)
+        ascending = np.argsort(ranks, kind='stable')
+        descending = np.argsort(-ranks, kind='stable')
+        return ascending, descending
+
+    def candidates(self, filters, min_rating=None, substring_fields=()):
+        """
+        Sorted row positions matching every non-empty filter.
+
+        Args:
+            filters (dict): field -> requested value; None/empty values are ignored
+            min_rating (float): optional minimum rating
+            substring_fields (iterable): fields matched by case-insensitive substring
+        """
+        result = None
+        for field, value in filters.items():
+            if value is None or value == "":
+                continue
+            positions = self.lookup(field, value, substring=field in substring_fields)
+            result = positions if result is None else np.intersect1d(result, positions, assume_unique=True)
+            if len(result) == 0:
+                return EMPTY_POSITIONS
+
+        if result is None:
+            result = np.arange(self.size, dtype=np.int64)
+        if min_rating is not None:
+            result = result[self.rating[result] >= min_rating]
+        return result
+
+    def top_k(self, positions, k):
+        """The k highest-rated positions out of ``positions``, best first"""
+        return self.page(positions, 'rating', descending=True, offset=0, limit=k)
+
+    def page(self, positions, sort_by='rating', descending=True, offset=0, limit=10):
+        """
+        One page of ``positions`` in a presorted order.
+
+        Args:
+            positions (np.ndarray): candidate row positions (e.g. from candidates())
+            sort_by (str): 'rating' or one of the extra sort keys
+            descending (bool): sort direction
+            offset (int): number of sorted matches to skip
+            limit (int): page size
+        """
+        if len(positions) == 0 or limit <= 0 or offset >= len(positions):
+            return EMPTY_POSITIONS
+        order = self.orders[(sort_by, descending)]
+        if len(positions) == self.size:
+            # Unfiltered: the page is a plain slice of the presorted order
+            return order[offset:offset + limit]
+        selected = np.zeros(self.size, dtype=bool)
+        selected[positions] = True
+        return order[selected[order]][offset:offset + limit]
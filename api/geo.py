@@ -0,0 +1,139 @@
+"""
+Spatial index over place coordinates.
+
+Places are stored in a BallTree with the haversine metric (coordinates in
+radians), so k-nearest and radius queries take logarithmic time instead of
+computing the distance to every place.
+"""
+
+import numpy as np
+from sklearn.neighbors import BallTree
+
+from filter_index import EMPTY_POSITIONS
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+class GeoIndex:
+    """BallTree over the places that have coordinates"""
+
+    def __init__(self, lat, lon):
+        """
+        Args:
+            lat (array-like): latitude per row in degrees (NaN if unknown)
+            lon (array-like): longitude per row in degrees (NaN if unknown)
+        """
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        self.size = len(lat)
+        known = np.isfinite(lat) & np.isfinite(lon)
+        # Tree row -> places row position
+        self.positions = np.flatnonzero(known)
+        self.tree = BallTree(np.radians(np.column_stack([lat[known], lon[known]])), metric='haversine')
+
+    def __len__(self):
+        return len(self.positions)
+
+    def nearest(self, lat, lon, k=10, radius_km=None, candidates=None):
+        """
+        The k places closest to a point, optionally within a radius and among candidates.
+
+        Args:
+            lat, lon (float): query point in degrees
+            k (int): maximum number of places to return
+            radius_km (float): only places within this distance
+            candidates (np.ndarray): row positions allowed (e.g. from FilterIndex.candidates)
+
+        Returns:
+            tuple: (row positions, distances in km), nearest first
+        """
+        if len(self) == 0 or k <= 0 or (candidates is not None and len(candidates) == 0):
+            return EMPTY_POSITIONS, np.empty(0)
+
+        allowed = None
+        if candidates is not None and len(candidates) < self.size:
+            allowed = np.zeros(self.size, dtype=bool)
+            allowed[candidates] = True
+
+        query = np.radians([[lat, lon]])
+        if radius_km is not None:
+            indices, distances = self.tree.query_radius(
+                query, r=radius_km / EARTH_RADIUS_KM, return_distance=True, sort_results=True
+            )
+            positions, distances = self.positions[indices[0]], distances[0]
+            if allowed is not None:
+                keep = allowed[positions]
+                positions, distances = positions[keep], distances[keep]
+            return positions[:k], distances[:k] * EARTH_RADIUS_KM
+
+        # k-NN with filters: widen the search until k allowed places are found
+        fetch = k
+        while True:
+            fetch = min(fetch, len(self))
+            distances, indices = self.tree.query(query, k=fetch)
+            positions, distances = self.positions[indices[0]], distances[0]
+            if allowed is not None:
+                keep = allowed[positions]
+                positions, distances = positions[keep], distances[keep]
+            if len(positions) >= k or fetch == len(self):
+                return positions[:k], distances[:k] * EARTH_RADIUS_KM
+            fetch *= 4
+
+
+def haversine_km(lat, lon, lat_rad, lon_rad, cos_lat=None):
+    """
+    Great-circle distance from one point to many, in a single vectorized pass.
+
+    Args:
+        lat, lon (float): origin in degrees
+        lat_rad, lon_rad (np.ndarray): destination coordinates in radians
+        cos_lat (np.ndarray): precomputed cos(lat_rad), optional
+
+    Returns:
+        np.ndarray: distances in km (NaN where a coordinate is unknown)
+    """
+    origin_lat, origin_lon = np.radians(lat), np.radians(lon)
+    if cos_lat is None:
+        cos_lat = np.cos(lat_rad)
+    a = (np.sin((lat_rad - origin_lat) / 2) ** 2
+         + np.cos(origin_lat) * cos_lat * np.sin((lon_rad - origin_lon) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class PlaceCoordinates:
+    """Radian coordinate arrays aligned with a places frame, for distance-decay scoring"""
+
+    def __init__(self, lat, lon):
+        """
+        Args:
+            lat (array-like): latitude per row in degrees (NaN if unknown)
+            lon (array-like): longitude per row in degrees (NaN if unknown)
+        """
+        self.lat_rad = np.radians(np.asarray(lat, dtype=np.float64))
+        self.lon_rad = np.radians(np.asarray(lon, dtype=np.float64))
+        self.cos_lat = np.cos(self.lat_rad)
+
+    def __len__(self):
+        return len(self.lat_rad)
+
+    @classmethod
+    def from_frames(cls, places_df, coords_df):
+        """Coordinates for places_df rows, looked up by Place_Id in a frame with Lat/Long"""
+        coords = coords_df.drop_duplicates('Place_Id').set_index('Place_Id')
+        coords = coords.reindex(places_df['Place_Id'].to_numpy())
+        return cls(coords['Lat'].to_numpy(dtype=np.float64), coords['Long'].to_numpy(dtype=np.float64))
+
+    def distances(self, lat, lon, positions=None):
+        """Distances in km from a point to the given rows (all rows by default)"""
+        if positions is None:
+            return haversine_km(lat, lon, self.lat_rad, self.lon_rad, self.cos_lat)
+        return haversine_km(lat, lon, self.lat_rad[positions], self.lon_rad[positions], self.cos_lat[positions])
+
+    def decay(self, lat, lon, half_life_km, positions=None):
+        """
+        Distance-decay score in (0, 1]: 1 at the origin, halved every half_life_km.
+
+        Places without coordinates score 0.
+        """
+        distances = self.distances(lat, lon, positions)
+        return np.nan_to_num(np.exp2(-distances / half_life_km), nan=0.0)
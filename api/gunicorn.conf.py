@@ -0,0 +1,36 @@
+"""
+Gunicorn configuration for production serving.
+
+The app is imported and the model loaded once in the master process
+(preload_app + when_ready); workers are forked afterwards, so places_df,
+the score matrices and the TF-IDF matrix are shared copy-on-write instead
+of being loaded per worker. Arrays from a model bundle are memory-mapped
+and shared through the page cache as well.
+
+    gunicorn -c gunicorn.conf.py api:app
+"""
+
+import gc
+import multiprocessing
+import os
+
+bind = f"{os.getenv('API_HOST', '0.0.0.0')}:{os.getenv('API_PORT', '8000')}"
+workers = int(os.getenv("API_WORKERS", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("API_TIMEOUT", "60"))
+keepalive = 5
+accesslog = "-"
+
+
+def when_ready(server):
+    """Load model and data in the master before any worker is forked"""
+    import api
+
+    api.place_store.load()
+    api.load_ml_model()
+
+    # Move everything allocated so far out of the GC's reach so collections in
+    # the workers don't touch (and thereby un-share) the preloaded objects
+    gc.freeze()
+    server.log.info("Model preloaded in master; forking %s workers", server.num_workers)
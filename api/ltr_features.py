@@ -0,0 +1,38 @@
+"""
+Feature layout of the LTR model, shared by training and serving.
+
+``training.features`` builds the training matrix and ``personalization``
+builds the serving matrix from this one definition, so the column order and
+the age/price rule cannot drift apart between the two. It lives in api/
+because the API image only ships this directory; the `train` package
+installs it as a top-level module next to ``model_bundle``.
+"""
+
+import numpy as np
+
+# Column order of the feature matrix the LTR model is trained and served on
+FEATURE_COLUMNS = [
+    "content_score", "user_cf_score", "item_cf_score", "Age",
+    "Rating", "Price", "Category", "City", "age_price_interaction",
+]
+
+
+def age_price_interaction(ages, price_category):
+    """
+    Age / price-tier fit for every (user, place) pair.
+
+    0 for users under 25 and expensive places, 0.5 for users over 40 and cheap
+    places, 1 otherwise.
+
+    Args:
+        ages (np.ndarray): age per user
+        price_category (np.ndarray): price tier (murah/menengah/mahal) per place
+
+    Returns:
+        np.ndarray: (len(ages), len(price_category)) matrix
+    """
+    ages = np.asarray(ages, dtype=np.float64)[:, None]
+    price_category = np.asarray(price_category).astype(str)[None, :]
+    young_expensive = (ages < 25) & (price_category == 'mahal')
+    old_cheap = (ages > 40) & (price_category == 'murah')
+    return np.where(young_expensive, 0.0, np.where(old_cheap, 0.5, 1.0))
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Versioned on-disk model bundle.
+
+Replaces the monolithic ``recommendation_artifacts_optimal.pkl`` with a
+directory per version:
+
+    model/bundle/
+        LATEST                  # name of the version to serve
+        <version>/
+            manifest.json       # format version, contents, creation time
+            ltr_model.txt       # native LightGBM model
+            places.parquet      # places_df
+            users.parquet       # users_df
+            ratings.parquet     # ratings_df (optional)
+            encoders.json       # LabelEncoder classes per column
+            <name>.npy          # numeric arrays, opened with mmap_mode="r"
+
+Arrays are memory-mapped, so every worker process reading the same bundle
+shares the pages through the OS page cache instead of holding its own copy.
+
+Convert an existing pickle with:
+    python model_bundle.py [--pickle model/recommendation_artifacts_optimal.pkl]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+BUNDLE_FORMAT_VERSION = 1
+LATEST_FILENAME = "LATEST"
+MANIFEST_FILENAME = "manifest.json"
+MODEL_FILENAME = "ltr_model.txt"
+LEGACY_PICKLE_FILENAME = "recommendation_artifacts_optimal.pkl"
+
+# Artifact key -> parquet file
+TABLES = {
+    "places_df": "places.parquet",
+    "users_df": "users.parquet",
+    "ratings_df": "ratings.parquet",
+}
+# Artifact keys stored as .npy arrays (X_full only when explicitly requested)
+SCORE_MATRIX_KEYS = ["content_scores", "user_cf_scores", "item_cf_scores"]
+ARRAYS = ["all_users", *SCORE_MATRIX_KEYS, "X_full"]
+
+
+def bundle_path(root, version=None):
+    """Directory of a bundle version (the LATEST one by default), or None if there is none"""
+    if version is None:
+        latest = os.path.join(root, LATEST_FILENAME)
+        if not os.path.exists(latest):
+            return None
+        with open(latest) as f:
+            version = f.read().strip()
+    path = os.path.join(root, version)
+    return path if os.path.exists(os.path.join(path, MANIFEST_FILENAME)) else None
+
+
+def score_matrices_from_x_full(artifacts):
+    """
+    Users x places score matrices taken from the first three columns of X_full.
+
+    Older pickles only ship X_full; its rows are all_users x places_df in order,
+    so each score column reshapes to the matrix the serving code expects.
+    """
+    x_full = np.asarray(artifacts["X_full"])
+    shape = (len(artifacts["all_users"]), len(artifacts["places_df"]))
+    return {
+        key: np.ascontiguousarray(x_full[:, column].reshape(shape), dtype=np.float32)
+        for column, key in enumerate(SCORE_MATRIX_KEYS)
+    }
+
+
+def save_bundle(artifacts, root, version=None, include_x_full=False, set_latest=True):
+    """
+    Write artifacts as a new bundle version and (by default) mark it as LATEST.
+
+    Args:
+        artifacts (dict): same keys as the legacy pickle
+        root (str): bundle root directory, e.g. ``model/bundle``
+        version (str): version name (defaults to a UTC timestamp)
+        include_x_full (bool): also store the full users x places feature matrix
+
+    Returns:
+        str: path of the written version directory
+
+    Raises:
+        ValueError: if the artifacts have neither the score matrices nor X_full
+    """
+    if not all(artifacts.get(key) is not None for key in SCORE_MATRIX_KEYS):
+        if artifacts.get("X_full") is None:
+            raise ValueError("Artifacts have neither the score matrices nor X_full; personalization could not load")
+        # Derive the score matrices so the bundle does not depend on X_full
+        artifacts = {**artifacts, **score_matrices_from_x_full(artifacts)}
+
+    version = version or datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+    os.makedirs(root, exist_ok=True)
+    target = os.path.join(root, version)
+    if os.path.exists(target):
+        raise FileExistsError(f"Bundle version already exists: {target}")
+
+    # Write into a temporary directory first so a half-written bundle is never served
+    staging = tempfile.mkdtemp(prefix=f".{version}-", dir=root)
+    os.chmod(staging, 0o755)
+    try:
+        model = artifacts["ltr_model"]
+        booster = model.booster_ if hasattr(model, "booster_") else model
+        booster.save_model(os.path.join(staging, MODEL_FILENAME))
+
+        tables = {}
+        for key, filename in TABLES.items():
+            if artifacts.get(key) is not None:
+                artifacts[key].to_parquet(os.path.join(staging, filename), index=False)
+                tables[key] = filename
+
+        arrays = {}
+        for key in ARRAYS:
+            if key == "X_full" and not include_x_full:
+                continue
+            if artifacts.get(key) is not None:
+                np.save(os.path.join(staging, f"{key}.npy"), np.ascontiguousarray(artifacts[key]))
+                arrays[key] = f"{key}.npy"
+
+        encoders = {
+            column: [value.item() if hasattr(value, "item") else value for value in encoder.classes_]
+            for column, encoder in (artifacts.get("encoders") or {}).items()
+        }
+        with open(os.path.join(staging, "encoders.json"), "w") as f:
+            json.dump(encoders, f, ensure_ascii=False)
+
+        manifest = {
+            "format_version": BUNDLE_FORMAT_VERSION,
+            "version": version,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "model": MODEL_FILENAME,
+            "tables": tables,
+            "arrays": arrays,
+            "encoders": "encoders.json",
+        }
+        with open(os.path.join(staging, MANIFEST_FILENAME), "w") as f:
+            json.dump(manifest, f, indent=2)
+
+        os.rename(staging, target)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    if set_latest:
+        set_latest_version(root, version)
+
+    return target
+
+
+def set_latest_version(root, version):
+    """Atomically point LATEST at an existing bundle version"""
+    latest_tmp = os.path.join(root, f".{LATEST_FILENAME}.tmp")
+    with open(latest_tmp, "w") as f:
+        f.write(version + "\n")
+    os.replace(latest_tmp, os.path.join(root, LATEST_FILENAME))
+
+
+def load_bundle(path):
+    """
+    Load a bundle version directory into an artifacts dict (same keys as the pickle).
+
+    Numeric arrays are memory-mapped read-only; the LTR model is a lightgbm.Booster.
+    """
+    import lightgbm as lgb
+    from sklearn.preprocessing import LabelEncoder
+
+    with open(os.path.join(path, MANIFEST_FILENAME)) as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != BUNDLE_FORMAT_VERSION:
+        raise ValueError(f"Unsupported bundle format {manifest.get('format_version')} in {path}")
+
+    artifacts = {
+        "bundle_version": manifest["version"],
+        "ltr_model": lgb.Booster(model_file=os.path.join(path, manifest["model"])),
+    }
+    for key, filename in manifest["tables"].items():
+        artifacts[key] = pd.read_parquet(os.path.join(path, filename))
+    for key, filename in manifest["arrays"].items():
+        artifacts[key] = np.load(os.path.join(path, filename), mmap_mode="r")
+
+    with open(os.path.join(path, manifest["encoders"])) as f:
+        encoders = {}
+        for column, classes in json.load(f).items():
+            encoder = LabelEncoder()
+            encoder.classes_ = np.asarray(classes)
+            encoders[column] = encoder
+    artifacts["encoders"] = encoders
+
+    return artifacts
+
+
+def load_artifacts(model_dir):
+    """
+    Load model artifacts from ``model_dir``: the LATEST bundle under ``bundle/``
+    if there is one, otherwise the legacy pickle.
+
+    Returns:
+        tuple: (artifacts, source_path) where source_path is the bundle manifest
+        or the pickle file, or (None, None) if neither exists
+    """
+    path = bundle_path(os.path.join(model_dir, "bundle"))
+    if path is not None:
+        return load_bundle(path), os.path.join(path, MANIFEST_FILENAME)
+
+    pickle_path = os.path.join(model_dir, LEGACY_PICKLE_FILENAME)
+    if not os.path.exists(pickle_path):
+        return None, None
+
+    import pickle
+    with open(pickle_path, "rb") as f:
+        return pickle.load(f), pickle_path
+
+
+def main():
+    import pickle
+
+    model_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "model")
+    parser = argparse.ArgumentParser(description="Convert a model pickle into a versioned bundle")
+    parser.add_argument("--pickle", default=os.path.join(model_dir, LEGACY_PICKLE_FILENAME))
+    parser.add_argument("--root", default=os.path.join(model_dir, "bundle"))
+    parser.add_argument("--version", default=None)
+    parser.add_argument("--include-x-full", action="store_true", help="also store X_full (large)")
+    args = parser.parse_args()
+
+    with open(args.pickle, "rb") as f:
+        artifacts = pickle.load(f)
+
+    path = save_bundle(artifacts, args.root, version=args.version, include_x_full=args.include_x_full)
+    print(f"Bundle written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Vectorized feature construction and scoring for personalized ranking.
+
+The training notebook exports the user x place content, user-CF and item-CF
+score matrices (float32, rows in ``all_users`` order, columns in ``places_df``
+order). A user's feature block is then a row gather from those matrices plus
+precomputed per-place columns, and all candidate places are scored by the
+LTR model in a single ``predict`` call.
+"""
+
+import numpy as np
+import pandas as pd
+
+from ltr_features import FEATURE_COLUMNS, age_price_interaction
+
+SCORE_MATRIX_KEYS = ("content_scores", "user_cf_scores", "item_cf_scores")
+
+
+class UserFeatureBuilder:
+    """Builds LTR feature blocks for known users from the model artifacts"""
+
+    def __init__(self, artifacts):
+        places_df = artifacts["places_df"]
+        users_df = artifacts["users_df"]
+
+        self.model = artifacts["ltr_model"]
+        self.user_ids = np.asarray(artifacts["all_users"])
+        self.user_index = pd.Index(self.user_ids)
+        self.place_ids = places_df['Place_Id'].to_numpy()
+        self.place_index = pd.Index(self.place_ids)
+        self.n_places = len(self.place_ids)
+
+        ages = users_df.drop_duplicates('User_Id').set_index('User_Id')['Age']
+        self.ages = ages.reindex(self.user_ids).to_numpy(dtype=np.float64)
+
+        # Static per-place columns: Rating, Price, Category (encoded), City (encoded)
+        self.place_block = places_df[['Rating', 'Price', 'Category', 'City']].to_numpy(dtype=np.float64)
+        self.price_category = places_df['price_category'].astype(str).to_numpy()
+
+        if all(key in artifacts for key in SCORE_MATRIX_KEYS):
+            self.score_matrices = [np.asarray(artifacts[key]) for key in SCORE_MATRIX_KEYS]
+        else:
+            # Older artifacts only ship X_full; its first three columns are the same scores
+            x_full = artifacts["X_full"]
+            shape = (len(self.user_ids), self.n_places)
+            self.score_matrices = [x_full[:, column].reshape(shape) for column in range(3)]
+
+    def user_positions(self, user_ids):
+        """Row positions of the given users (-1 for unknown users)"""
+        return self.user_index.get_indexer(user_ids)
+
+    def place_positions(self, place_ids):
+        """Column positions of the given places (-1 for unknown places)"""
+        return self.place_index.get_indexer(place_ids)
+
+    def features(self, user_positions, place_positions=None):
+        """
+        Feature matrix for users x places, stacked user by user.
+
+        Args:
+            user_positions (array-like): row positions of known users
+            place_positions (array-like): column positions to score (defaults to all places)
+
+        Returns:
+            np.ndarray: (len(users) * len(places), len(FEATURE_COLUMNS)) float64 matrix
+        """
+        user_positions = np.asarray(user_positions)
+        if place_positions is None:
+            place_positions = np.arange(self.n_places)
+        place_positions = np.asarray(place_positions)
+        n_users, n_places = len(user_positions), len(place_positions)
+
+        rows = np.ix_(user_positions, place_positions)
+        ages = self.ages[user_positions]
+
+        features = np.empty((n_users, n_places, len(FEATURE_COLUMNS)), dtype=np.float64)
+        for column, matrix in enumerate(self.score_matrices):
+            features[:, :, column] = matrix[rows]
+        features[:, :, 3] = ages[:, None]
+        features[:, :, 4:8] = self.place_block[place_positions][None, :, :]
+        features[:, :, 8] = age_price_interaction(ages, self.price_category[place_positions])
+        return features.reshape(n_users * n_places, len(FEATURE_COLUMNS))
+
+    def predict(self, user_positions, place_positions=None):
+        """LTR scores as a (len(users), len(places)) matrix from one predict call"""
+        user_positions = np.asarray(user_positions)
+        features = self.features(user_positions, place_positions)
+        scores = self.model.predict(features)
+        return np.asarray(scores).reshape(len(user_positions), -1)
@@ -0,0 +1,186 @@
+"""
+In-memory store for the tourism places CSV.
+
+The CSV is parsed once and kept as typed NumPy columns; it is only re-read
+when the file's mtime changes, so request handlers never touch the disk.
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from filter_index import FilterIndex
+from geo import GeoIndex
+
+DESCRIPTION_PREVIEW_LENGTH = 200
+
+# Price tiers used by the CSV recommendation path (upper bounds are inclusive)
+CSV_PRICE_BINS = [-np.inf, 50000, 200000, np.inf]
+CSV_PRICE_LABELS = ['murah', 'menengah', 'mahal']
+
+# Sortable fields -> default direction (True = descending)
+SORT_FIELDS = {'rating': True, 'name': False, 'price': False}
+
+
+def truncate_descriptions(descriptions, length=DESCRIPTION_PREVIEW_LENGTH):
+    """Truncate descriptions to a preview, appending '...' when shortened"""
+    descriptions = pd.Series(descriptions).astype(str)
+    too_long = descriptions.str.len() > length
+    preview = descriptions.where(~too_long, descriptions.str[:length] + "...")
+    return preview.to_numpy(dtype=object)
+
+
+@dataclass(frozen=True)
+class PlaceTable:
+    """Column-oriented snapshot of the places CSV with precomputed keys"""
+    place_id: np.ndarray        # int64
+    place_name: np.ndarray      # object (str)
+    description: np.ndarray     # object (str), truncated preview
+    category: np.ndarray        # object (str)
+    city: np.ndarray            # object (str)
+    price: np.ndarray           # int64, missing prices are 0
+    rating: np.ndarray          # float64, missing ratings are 0.0
+    price_category: np.ndarray  # object (str), murah/menengah/mahal
+    city_key: np.ndarray        # lowercased city
+    category_key: np.ndarray    # lowercased category
+    index: FilterIndex          # postings over city_key/category_key/price_category, sorted orders
+    geo: GeoIndex               # BallTree over Lat/Long
+
+    def __len__(self):
+        return len(self.place_id)
+
+    @classmethod
+    def from_frame(cls, df):
+        """Build a table from the raw ``tourism_with_id.csv`` frame"""
+        price = df['Price'].fillna(0).astype('int64').to_numpy()
+        price_category = pd.cut(price, bins=CSV_PRICE_BINS, labels=CSV_PRICE_LABELS)
+        city = df['City'].astype(str).to_numpy(dtype=object)
+        category = df['Category'].astype(str).to_numpy(dtype=object)
+        city_key = np.char.lower(city.astype(str)).astype(object)
+        category_key = np.char.lower(category.astype(str)).astype(object)
+        price_category = np.asarray(price_category, dtype=object)
+        rating = df['Rating'].fillna(0.0).astype('float64').to_numpy()
+        place_name = df['Place_Name'].astype(str).to_numpy(dtype=object)
+
+        return cls(
+            place_id=df['Place_Id'].astype('int64').to_numpy(),
+            place_name=place_name,
+            description=truncate_descriptions(df['Description']),
+            category=category,
+            city=city,
+            price=price,
+            rating=rating,
+            price_category=price_category,
+            city_key=city_key,
+            category_key=category_key,
+            index=FilterIndex(
+                {'city': city_key, 'category': category_key, 'price_category': price_category},
+                rating,
+                sort_keys={'name': np.char.lower(place_name.astype(str)), 'price': price},
+            ),
+            geo=GeoIndex(
+                pd.to_numeric(df['Lat'], errors='coerce').to_numpy(),
+                pd.to_numeric(df['Long'], errors='coerce').to_numpy(),
+            ),
+        )
+
+    def filter(self, location=None, min_rating=None, price_category=None, category=None):
+        """Return row positions matching the CSV recommendation filters"""
+        if price_category and price_category.lower() not in CSV_PRICE_LABELS:
+            price_category = None
+
+        return self.index.candidates(
+            {
+                'city': location,
+                'category': category,
+                'price_category': price_category.lower() if price_category else None,
+            },
+            min_rating=min_rating or None,
+            substring_fields=('city', 'category'),
+        )
+
+    def top_by_rating(self, positions, top_n):
+        """Order positions by rating (highest first) and keep the first top_n"""
+        return self.index.top_k(positions, top_n)
+
+    def page(self, positions, sort_by='rating', descending=None, offset=0, limit=10):
+        """Positions of one sorted page (descending defaults per field, see SORT_FIELDS)"""
+        if descending is None:
+            descending = SORT_FIELDS[sort_by]
+        return self.index.page(positions, sort_by, descending, offset, limit)
+
+    def nearest(self, lat, lon, k=10, radius_km=None, positions=None):
+        """Nearest places to a point among positions as (positions, distances in km)"""
+        return self.geo.nearest(lat, lon, k, radius_km, positions)
+
+    def columns(self, positions):
+        """Response columns (typed arrays) for the given row positions"""
+        return {
+            "Place_Id": self.place_id[positions],
+            "Place_Name": self.place_name[positions],
+            "Description": self.description[positions],
+            "Category": self.category[positions],
+            "City": self.city[positions],
+            "Price": self.price[positions],
+            "Rating": self.rating[positions],
+            "score": self.rating[positions],
+            "price_category": self.price_category[positions],
+        }
+
+
+class PlaceStore:
+    """Thread-safe holder for a PlaceTable that reloads when the CSV changes"""
+
+    def __init__(self, csv_path, check_interval=5.0):
+        self.csv_path = csv_path
+        self.check_interval = check_interval
+        self.version = 0
+        self._table: Optional[PlaceTable] = None
+        self._mtime = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def load(self):
+        """(Re)load the CSV into memory; returns True if a table is available"""
+        with self._lock:
+            return self._load_locked()
+
+    def _load_locked(self):
+        self._last_check = time.monotonic()
+        try:
+            mtime = os.path.getmtime(self.csv_path)
+        except OSError:
+            print(f"CSV file not found at: {self.csv_path}")
+            self._table, self._mtime = None, None
+            return False
+
+        if self._table is not None and mtime == self._mtime:
+            return True
+
+        try:
+            table = PlaceTable.from_frame(pd.read_csv(self.csv_path))
+        except Exception as e:
+            print(f"Error loading CSV data: {e}")
+            return self._table is not None
+
+        self._table, self._mtime = table, mtime
+        self.version += 1
+        print(f"Loaded {len(table)} places from {self.csv_path}")
+        return True
+
+    def check_due(self):
+        """True if the next get() will stat the CSV (and reload it if it changed)"""
+        return time.monotonic() - self._last_check >= self.check_interval
+
+    def get(self):
+        """Return the current table, checking the file mtime at most every check_interval seconds"""
+        if self.check_due():
+            with self._lock:
+                if self.check_due():
+                    self._load_locked()
+        return self._table
@@ -0,0 +1,158 @@
+"""
+In-process cache of serialized recommendation responses.
+
+The homepage asks for the same few city queries over and over, so finished
+response bodies are kept keyed on the normalized query. Entries expire after
+``ttl`` seconds, the least recently used ones are evicted once the entry or
+byte limit is reached, and everything is dropped when the data generation
+(place CSV version, loaded model) changes.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_text(value):
+    """Strip a string filter; empty strings mean "no filter" like in the handlers"""
+    if value is None:
+        return None
+    value = value.strip()
+    return value or None
+
+
+def normalize_interests(interests):
+    """Interest keywords as a sorted tuple (the TF-IDF query is a bag of words, so order is irrelevant)"""
+    if not interests:
+        return ()
+    if isinstance(interests, str):
+        interests = interests.split(',')
+    return tuple(sorted(term.strip() for term in interests if term and term.strip()))
+
+
+def recommendation_key(endpoint, location=None, min_rating=None, price_category=None,
+                       category=None, interests=None, top_n=10, origin=None, half_life_km=None):
+    """Cache key for a general recommendation query (origin is an optional (lat, lon) pair)"""
+    return (
+        endpoint,
+        normalize_text(location),
+        float(min_rating) if min_rating else None,
+        normalize_text(price_category),
+        normalize_text(category),
+        normalize_interests(interests),
+        int(top_n),
+        (float(origin[0]), float(origin[1]), float(half_life_km)) if origin is not None else None,
+    )
+
+
+def catalog_key(location=None, min_rating=None, price_category=None, category=None,
+                sort_by='rating', descending=True, offset=0, limit=10):
+    """Cache key for a sorted/paginated catalog query"""
+    return (
+        "PAGE",
+        normalize_text(location),
+        float(min_rating) if min_rating else None,
+        normalize_text(price_category),
+        normalize_text(category),
+        sort_by,
+        bool(descending),
+        int(offset),
+        int(limit),
+    )
+
+
+class ResultCache:
+    """Thread-safe LRU + TTL cache of response bodies (bytes) and their extra headers"""
+
+    def __init__(self, max_entries=256, max_bytes=32 * 1024 * 1024, ttl=300.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.generation = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()  # key -> (expires_at, body, headers)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """Sized from API_CACHE_SIZE / API_CACHE_MAX_MB / API_CACHE_TTL (size 0 disables caching)"""
+        return cls(
+            max_entries=int(os.getenv("API_CACHE_SIZE", "256")),
+            max_bytes=int(float(os.getenv("API_CACHE_MAX_MB", "32")) * 1024 * 1024),
+            ttl=float(os.getenv("API_CACHE_TTL", "300")),
+        )
+
+    def validate(self, generation):
+        """Drop every entry if the data generation changed since the last call"""
+        with self._lock:
+            if generation != self.generation:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self._bytes = 0
+                self.generation = generation
+
+    def get(self, key):
+        """Cached (body, headers) for key, or None if missing or expired"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def put(self, key, body, generation=None, headers=None):
+        """
+        Store a body, evicting least recently used entries to stay within bounds.
+
+        If ``generation`` is given and no longer current (a reload happened while
+        the result was computed) the body is not stored.
+        """
+        if self.max_entries <= 0 or len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, body, dict(headers or {}))
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key):
+        _, body, _ = self._entries.pop(key)
+        self._bytes -= len(body)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
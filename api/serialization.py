@@ -0,0 +1,100 @@
+"""
+Columnar JSON serialization for recommendation responses.
+
+Results are kept as typed NumPy columns until the very end and turned into
+JSON bytes in one pass with orjson. Handlers return the bytes directly, so
+FastAPI does not build a Pydantic model per row or validate response_model
+a second time.
+"""
+
+import csv
+import io
+
+import numpy as np
+import orjson
+from fastapi import Response
+
+from place_store import truncate_descriptions
+
+# Field order of TourismRecommendationResponse
+RESPONSE_FIELDS = [
+    "Place_Id", "Place_Name", "Description", "Category", "City",
+    "Price", "Rating", "score", "price_category",
+]
+
+# Streaming export formats -> media type
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def frame_to_columns(df, score_column='score'):
+    """Response columns from a places_df-shaped frame (Category_name/City_name etc.)"""
+    return {
+        "Place_Id": df['Place_Id'].to_numpy(dtype=np.int64),
+        "Place_Name": df['Place_Name'].astype(str).to_numpy(dtype=object),
+        "Description": truncate_descriptions(df['Description'].fillna("")),
+        "Category": df['Category_name'].astype(str).to_numpy(dtype=object),
+        "City": df['City_name'].astype(str).to_numpy(dtype=object),
+        "Price": df['Price'].fillna(0).to_numpy(dtype=np.int64),
+        "Rating": df['Rating'].fillna(0.0).to_numpy(dtype=np.float64),
+        "score": df[score_column].to_numpy(dtype=np.float64),
+        "price_category": df['price_category'].astype(str).to_numpy(dtype=object),
+    }
+
+
+def records_to_columns(records):
+    """Response columns from a list of response dicts (e.g. the dummy fallback data)"""
+    return {field: np.array([record[field] for record in records], dtype=object) for field in RESPONSE_FIELDS}
+
+
+def columns_to_json(columns):
+    """Serialize response columns to a JSON array of objects"""
+    names = list(columns)
+    values = [np.asarray(columns[name]).tolist() for name in names]
+    return orjson.dumps([dict(zip(names, row)) for row in zip(*values)])
+
+
+def json_response(content, status_code=200, headers=None):
+    """Wrap pre-serialized JSON bytes in a response"""
+    return Response(content=content, status_code=status_code, headers=headers, media_type="application/json")
+
+
+def recommendations_response(columns, headers=None):
+    """Serialize response columns and wrap them in a JSON response"""
+    return json_response(columns_to_json(columns), headers=headers)
+
+
+def batch_response(results, headers=None):
+    """JSON array with one result array per query; None results become empty arrays"""
+    body = b",".join(b"[]" if columns is None else columns_to_json(columns) for columns in results)
+    return json_response(b"[" + body + b"]", headers=headers)
+
+
+def export_chunks(column_chunks, fields, fmt="ndjson"):
+    """
+    Encode an iterable of response column chunks for a streaming export.
+
+    Args:
+        column_chunks (iterable): response columns per chunk of rows
+        fields (list): fields to keep, in output order
+        fmt (str): 'ndjson' (one JSON object per line) or 'csv' (with a header row)
+
+    Yields:
+        bytes: one encoded chunk at a time
+    """
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        yield buffer.getvalue().encode()
+        for columns in column_chunks:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(zip(*(np.asarray(columns[name]).tolist() for name in fields)))
+            yield buffer.getvalue().encode()
+        return
+
+    for columns in column_chunks:
+        values = [np.asarray(columns[name]).tolist() for name in fields]
+        yield b"".join(
+            orjson.dumps(dict(zip(fields, row)), option=orjson.OPT_APPEND_NEWLINE) for row in zip(*values)
+        )
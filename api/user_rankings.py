@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Precomputed per-user LTR rankings.
+
+Every known user's places are scored offline with the LTR model, places the
+user already rated are dropped, and the rest are stored best-first. Serving a
+personalized request is then a walk down that user's list, keeping places
+that pass the request filters, until top_n are found.
+
+Run as a batch job next to the model artifacts:
+    python user_rankings.py [--top-n N]
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+RANKINGS_FILENAME = "user_rankings.npz"
+
+
+def model_fingerprint(model_path):
+    """Identifies the artifact a rankings file was built from (mtime + size)"""
+    stat = os.stat(model_path)
+    return f"{int(stat.st_mtime_ns)}:{stat.st_size}"
+
+
+class UserRankings:
+    """Best-first unrated place positions and scores for every known user"""
+
+    def __init__(self, user_ids, ranked, scores, lengths, fingerprint=""):
+        self.user_ids = np.asarray(user_ids)
+        self.ranked = np.asarray(ranked, dtype=np.int32)    # (users, N), padded with -1
+        self.scores = np.asarray(scores, dtype=np.float32)  # (users, N), aligned with ranked
+        self.lengths = np.asarray(lengths, dtype=np.int32)  # valid entries per user
+        self.fingerprint = fingerprint
+        self._row = {user_id: row for row, user_id in enumerate(self.user_ids.tolist())}
+
+    def __contains__(self, user_id):
+        return user_id in self._row
+
+    def top(self, user_id, candidate_mask, k):
+        """
+        Up to k best places for a user among the candidates.
+
+        Args:
+            user_id: a known user id
+            candidate_mask (np.ndarray): bool per places_df row, True if the place passes the filters
+            k (int): number of places to return
+
+        Returns:
+            tuple: (places_df row positions, LTR scores), best first
+        """
+        row = self._row[user_id]
+        ranked = self.ranked[row, :self.lengths[row]]
+        scores = self.scores[row, :self.lengths[row]]
+
+        # Walk the ranked list in chunks so selective filters don't scan it all
+        chunk = max(4 * k, 64)
+        found_positions, found_scores, found = [], [], 0
+        for start in range(0, len(ranked), chunk):
+            positions = ranked[start:start + chunk]
+            hits = candidate_mask[positions]
+            found_positions.append(positions[hits])
+            found_scores.append(scores[start:start + chunk][hits])
+            found += int(hits.sum())
+            if found >= k:
+                break
+
+        if not found_positions:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+        return np.concatenate(found_positions)[:k], np.concatenate(found_scores)[:k]
+
+    def save(self, path):
+        np.savez(path, user_ids=self.user_ids, ranked=self.ranked, scores=self.scores,
+                 lengths=self.lengths, fingerprint=np.array(self.fingerprint))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data["user_ids"], data["ranked"], data["scores"], data["lengths"],
+                       str(data["fingerprint"]))
+
+
+def rated_mask(builder, ratings_df):
+    """Bool (users, places) matrix, True where the user already rated the place"""
+    mask = np.zeros((len(builder.user_ids), builder.n_places), dtype=bool)
+    if ratings_df is None or ratings_df.empty:
+        return mask
+    users = builder.user_positions(ratings_df['User_Id'].to_numpy())
+    places = builder.place_positions(ratings_df['Place_Id'].to_numpy())
+    known = (users >= 0) & (places >= 0)
+    mask[users[known], places[known]] = True
+    return mask
+
+
+def build_user_rankings(builder, ratings_df=None, top_n=None, chunk_size=256, fingerprint=""):
+    """
+    Score every known user against every place and keep their unrated places best-first.
+
+    Args:
+        builder (UserFeatureBuilder): feature builder over the model artifacts
+        ratings_df (pd.DataFrame): User_Id/Place_Id pairs to exclude (already rated)
+        top_n (int): keep only the first top_n places per user (defaults to all)
+        chunk_size (int): users scored per predict call
+    """
+    n_users, n_places = len(builder.user_ids), builder.n_places
+    width = n_places if top_n is None else min(top_n, n_places)
+    already_rated = rated_mask(builder, ratings_df)
+
+    ranked = np.full((n_users, width), -1, dtype=np.int32)
+    scores = np.zeros((n_users, width), dtype=np.float32)
+    lengths = np.zeros(n_users, dtype=np.int32)
+
+    for start in range(0, n_users, chunk_size):
+        users = np.arange(start, min(start + chunk_size, n_users))
+        block = builder.predict(users)
+        block[already_rated[users]] = -np.inf
+        order = np.argsort(-block, axis=1, kind='stable')[:, :width]
+
+        for offset, user in enumerate(users):
+            valid = order[offset][np.isfinite(block[offset, order[offset]])]
+            lengths[user] = len(valid)
+            ranked[user, :len(valid)] = valid
+            scores[user, :len(valid)] = block[offset, valid]
+
+    return UserRankings(builder.user_ids, ranked, scores, lengths, fingerprint)
+
+
+def main():
+    from model_bundle import load_artifacts
+    from personalization import UserFeatureBuilder
+
+    parser = argparse.ArgumentParser(description="Precompute per-user LTR rankings")
+    parser.add_argument("--model-dir", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "model"))
+    parser.add_argument("--output", default=None, help=f"defaults to {RANKINGS_FILENAME} next to the model")
+    parser.add_argument("--top-n", type=int, default=None, help="places kept per user (default: all)")
+    args = parser.parse_args()
+
+    artifacts, model_path = load_artifacts(args.model_dir)
+    if artifacts is None:
+        parser.error(f"No model bundle or pickle found in {args.model_dir}")
+
+    rankings = build_user_rankings(
+        UserFeatureBuilder(artifacts),
+        artifacts.get("ratings_df"),
+        top_n=args.top_n,
+        fingerprint=model_fingerprint(model_path),
+    )
+    output = args.output or os.path.join(os.path.dirname(model_path), RANKINGS_FILENAME)
+    rankings.save(output)
+    print(f"Saved rankings for {len(rankings.user_ids)} users to {output}")
+
+
+if __name__ == "__main__":
+    main()
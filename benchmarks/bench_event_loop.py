@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark: tail latency with scoring on vs off the event loop.
+
+Runs a single uvicorn worker twice: with API_EXECUTOR_THREADS=0 (scoring runs
+inline on the event loop, the old behaviour) and with a bounded thread pool.
+Heavy interest-scoring POSTs and cheap GET / probes are sent concurrently;
+the probe latency shows how much the scoring work blocks other requests.
+503s are requests shed by the executor's queue limit.
+
+Usage:
+    python benchmarks/bench_event_loop.py [--threads 4] [--queue 16] [--clients 32] [--duration 10]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+from bench_workers import API_DIR, wait_until_ready
+
+HEAVY = ("POST", "/recommendations", {"interests": ["pantai", "pulau", "museum", "sejarah"], "top_n": 50})
+PROBE = ("GET", "/", None)
+
+
+def client_loop(port, request, stop, latencies, statuses):
+    method, path, body = request
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            if body is None:
+                conn.request(method, path)
+            else:
+                conn.request(method, path, body=json.dumps(body), headers={"Content-Type": "application/json"})
+            response = conn.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            statuses.append("conn")
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+            continue
+        statuses.append(response.status)
+        if response.status == 200:
+            latencies.append(time.perf_counter() - start)
+    conn.close()
+
+
+def percentile(latencies, q):
+    if not latencies:
+        return float("nan")
+    ordered = sorted(latencies)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+
+def run(label, threads, queue, clients, duration, port):
+    env = dict(os.environ, API_EXECUTOR_THREADS=str(threads), API_EXECUTOR_QUEUE=str(queue))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api:app", "--host", "127.0.0.1", "--port", str(port), "--no-access-log"],
+        cwd=API_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        if not wait_until_ready(port):
+            raise RuntimeError(f"API ({label}) did not start")
+
+        stop = threading.Event()
+        heavy_latencies, heavy_statuses = [], []
+        probe_latencies, probe_statuses = [], []
+        workers = [threading.Thread(target=client_loop, args=(port, HEAVY, stop, heavy_latencies, heavy_statuses))
+                   for _ in range(clients)]
+        workers.append(threading.Thread(target=client_loop, args=(port, PROBE, stop, probe_latencies, probe_statuses)))
+        for worker in workers:
+            worker.start()
+        time.sleep(duration)
+        stop.set()
+        for worker in workers:
+            worker.join()
+
+        shed = heavy_statuses.count(503)
+        print(f"{label:<14} {len(heavy_latencies) / duration:>8.0f} {percentile(heavy_latencies, 0.5):>9.1f} "
+              f"{percentile(heavy_latencies, 0.99):>9.1f} {shed:>6} "
+              f"{percentile(probe_latencies, 0.5):>9.1f} {percentile(probe_latencies, 0.99):>9.1f}")
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--queue", type=int, default=16)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    print(f"{'mode':<14} {'ok req/s':>8} {'p50 ms':>9} {'p99 ms':>9} {'503s':>6} {'probe p50':>9} {'probe p99':>9}")
+    run("inline", 0, 0, args.clients, args.duration, args.port)
+    run(f"pool {args.threads}+{args.queue}", args.threads, args.queue, args.clients, args.duration, args.port)
+
+
+if __name__ == "__main__":
+    main()
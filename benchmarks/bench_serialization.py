@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-request serialization cost of /recommendations responses.
+
+Compares the previous path (one TourismRecommendationResponse per row, then
+FastAPI re-validating response_model and JSON-encoding it) with the columnar
+orjson path used by the handlers now.
+
+Usage:
+    python benchmarks/bench_serialization.py [--top-n 50] [--repeat 2000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import List
+
+API_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api")
+sys.path.insert(0, API_DIR)
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from api import TourismRecommendationResponse  # noqa: E402
+from place_store import PlaceStore  # noqa: E402
+from serialization import columns_to_json  # noqa: E402
+
+
+def per_row_pydantic(records, adapter):
+    """Previous path: build models per row, validate response_model again, encode"""
+    response = [TourismRecommendationResponse(**record) for record in records]
+    validated = adapter.validate_python(response)
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--top-n", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    store = PlaceStore(os.path.join(API_DIR, "data", "tourism_with_id.csv"))
+    store.load()
+    places = store.get()
+    positions = places.top_by_rating(places.filter(), args.top_n)
+    columns = places.columns(positions)
+    records = [dict(zip(columns, row)) for row in zip(*(c.tolist() for c in columns.values()))]
+    adapter = TypeAdapter(List[TourismRecommendationResponse])
+
+    before = timed(lambda: per_row_pydantic(records, adapter), args.repeat)
+    after = timed(lambda: columns_to_json(places.columns(positions)), args.repeat)
+
+    print(f"rows per response:        {len(positions)}")
+    print(f"per-row pydantic + json:  {before:8.1f} us/request")
+    print(f"columnar orjson:          {after:8.1f} us/request")
+    print(f"speedup:                  {before / after:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Benchmark: API throughput and memory across gunicorn worker counts.
+
+Starts ``gunicorn -c gunicorn.conf.py api:app`` with 1/2/4/8 workers, drives
+it with concurrent keep-alive clients and reports requests/s, latency
+percentiles and the memory footprint of the process tree (RSS and PSS; PSS
+splits shared pages between processes, so sub-linear growth shows sharing).
+
+Usage:
+    python benchmarks/bench_workers.py [--workers 1 2 4 8] [--clients 32] [--duration 10]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+API_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api")
+
+REQUESTS = [
+    ("GET", "/recommendations?location=Jakarta&min_rating=3.0&top_n=50", None),
+    ("GET", "/recommendations?category=Bahari&top_n=20", None),
+    ("POST", "/recommendations", {"interests": ["pantai", "pulau"], "top_n": 10}),
+    ("POST", "/recommendations", {"location": "Bandung", "interests": ["gunung"], "top_n": 10}),
+]
+
+
+def wait_until_ready(port, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/")
+            if conn.getresponse().status == 200:
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def process_tree(pid):
+    """pid plus all descendants (Linux /proc)"""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+                children.setdefault(ppid, []).append(int(entry))
+            except (OSError, IndexError, ValueError):
+                pass
+    tree, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        tree.append(current)
+        stack.extend(children.get(current, []))
+    return tree
+
+
+def memory_mb(pid):
+    """Total (RSS, PSS) in MB of a process tree, from /proc/<pid>/smaps_rollup"""
+    rss = pss = 0
+    for child in process_tree(pid):
+        try:
+            with open(f"/proc/{child}/smaps_rollup") as f:
+                for line in f:
+                    if line.startswith("Rss:"):
+                        rss += int(line.split()[1])
+                    elif line.startswith("Pss:"):
+                        pss += int(line.split()[1])
+        except OSError:
+            pass
+    return rss / 1024, pss / 1024
+
+
+def client_loop(port, stop, latencies, errors):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    i = 0
+    while not stop.is_set():
+        method, path, body = REQUESTS[i % len(REQUESTS)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            if body is None:
+                conn.request(method, path)
+            else:
+                conn.request(method, path, body=json.dumps(body), headers={"Content-Type": "application/json"})
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 500:
+                errors.append(response.status)
+        except (OSError, http.client.HTTPException):
+            errors.append("conn")
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+
+def run(workers, clients, duration, port):
+    env = dict(os.environ, API_WORKERS=str(workers), API_PORT=str(port), API_HOST="127.0.0.1")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--access-logfile", "/dev/null", "api:app"],
+        cwd=API_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        if not wait_until_ready(port):
+            raise RuntimeError(f"API with {workers} workers did not start")
+
+        stop, latencies, errors = threading.Event(), [], []
+        threads = [threading.Thread(target=client_loop, args=(port, stop, latencies, errors)) for _ in range(clients)]
+        for thread in threads:
+            thread.start()
+        time.sleep(duration)
+        rss, pss = memory_mb(server.pid)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        latencies.sort()
+        pct = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000 if latencies else float("nan")
+        print(f"{workers:>7} {len(latencies) / duration:>9.0f} {pct(0.5):>8.1f} {pct(0.99):>8.1f} "
+              f"{len(errors):>6} {rss:>8.0f} {pss:>8.0f}")
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    print(f"{'workers':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>6} {'RSS MB':>8} {'PSS MB':>8}")
+    for workers in args.workers:
+        run(workers, args.clients, args.duration, args.port)
+
+
+if __name__ == "__main__":
+    main()
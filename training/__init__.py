@@ -0,0 +1,10 @@
+"""Offline training helpers for the LTR recommendation model (see notebooks/Model.ipynb)."""
+
+import os
+import sys
+
+# Modules shared with the API (model_bundle, ltr_features) are top-level modules in api/;
+# an installed `train` ships them itself, a checkout imports them from there
+_API_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api")
+if os.path.isdir(_API_DIR) and _API_DIR not in sys.path:
+    sys.path.insert(0, _API_DIR)
@@ -0,0 +1,119 @@
+"""
+Sparse collaborative filtering scores for the LTR features.
+
+The notebook used to pivot the ratings into a dense user x place matrix and
+compute full dense cosine similarities for users x users and places x places,
+which grows quadratically with the data. Here the interactions stay in a
+``scipy.sparse`` CSR matrix and similarities are computed one block of rows
+(or columns) at a time, sized so a block fits a memory budget. Each block's
+similarities are optionally pruned to the ``top_k`` nearest neighbours and
+immediately turned into CF scores, so the full similarity matrix never
+exists.
+
+Without pruning the scores equal the dense formulation:
+    user_cf = S_u @ R / |S_u|.sum(axis=1)[:, None]
+    item_cf = R @ S_i / |S_i|.sum(axis=1)[None, :]
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.preprocessing import normalize
+
+DEFAULT_MEMORY_BUDGET_MB = 256
+
+
+def interaction_matrix(ratings_df, user_col='User_Id', item_col='Place_Id', rating_col='Place_Ratings'):
+    """
+    Ratings as a CSR user x item matrix (like ``pivot_table(...).fillna(0)``).
+
+    Users and items are sorted by id; duplicate ratings are averaged.
+
+    Returns:
+        tuple: (csr_matrix, user ids, item ids)
+    """
+    ratings = ratings_df.groupby([user_col, item_col], sort=False)[rating_col].mean().reset_index()
+    user_codes, user_ids = pd.factorize(ratings[user_col], sort=True)
+    item_codes, item_ids = pd.factorize(ratings[item_col], sort=True)
+    matrix = sparse.csr_matrix(
+        (ratings[rating_col].to_numpy(dtype=np.float64), (user_codes, item_codes)),
+        shape=(len(user_ids), len(item_ids)),
+    )
+    return matrix, np.asarray(user_ids), np.asarray(item_ids)
+
+
+def block_size(n_similarities, n_scores, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB):
+    """Rows per block so one block of float64 similarities plus scores fits the budget"""
+    per_row = (n_similarities + n_scores) * 8
+    return max(1, int(memory_budget_mb * 1024 * 1024 // per_row))
+
+
+def prune_top_k(similarities, top_k):
+    """Keep the top_k largest entries of each row of a dense block (in place)"""
+    if top_k is None or top_k >= similarities.shape[1]:
+        return similarities
+    threshold_idx = np.argpartition(-similarities, top_k - 1, axis=1)[:, top_k:]
+    np.put_along_axis(similarities, threshold_idx, 0.0, axis=1)
+    return similarities
+
+
+def _cf_scores(vectors, matrix, top_k, memory_budget_mb, dtype, out, transpose):
+    """Shared blockwise loop: similarities of each block of ``vectors`` rows to all rows, then scores"""
+    n, n_scores = vectors.shape[0], (matrix.shape[1] if not transpose else matrix.shape[0])
+    if out is None:
+        out = np.empty((matrix.shape[0], matrix.shape[1]), dtype=dtype)
+    step = block_size(n, n_scores, memory_budget_mb)
+    vectors_t = vectors.T.tocsr()
+
+    for start in range(0, n, step):
+        stop = min(start + step, n)
+        similarities = prune_top_k((vectors[start:stop] @ vectors_t).toarray(), top_k)
+        denominators = np.abs(similarities).sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if transpose:
+                # Item block: scores for items start:stop over all users
+                scores = np.asarray(matrix @ similarities.T) / denominators[None, :]
+                out[:, start:stop] = scores
+            else:
+                # User block: scores of users start:stop for all items
+                scores = np.asarray((matrix.T @ similarities.T).T) / denominators[:, None]
+                out[start:stop] = scores
+    return out
+
+
+def user_cf_scores(matrix, top_k=None, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB, dtype=np.float64, out=None):
+    """
+    User-based CF scores: each user's ratings predicted from similar users.
+
+    Args:
+        matrix (sparse matrix): user x item ratings (see interaction_matrix)
+        top_k (int): neighbours kept per user (None = all, exact)
+        memory_budget_mb (float): working memory for one block of users
+        dtype: dtype of the result
+        out (np.ndarray): optional (users, items) array to fill, e.g. a np.memmap
+
+    Returns:
+        np.ndarray: (users, items) scores
+    """
+    matrix = sparse.csr_matrix(matrix, dtype=np.float64)
+    user_vectors = normalize(matrix, norm='l2', axis=1).tocsr()
+    return _cf_scores(user_vectors, matrix, top_k, memory_budget_mb, dtype, out, transpose=False)
+
+
+def item_cf_scores(matrix, top_k=None, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB, dtype=np.float64, out=None):
+    """
+    Item-based CF scores: each user's rating of an item predicted from similar items.
+
+    Args:
+        matrix (sparse matrix): user x item ratings (see interaction_matrix)
+        top_k (int): neighbours kept per item (None = all, exact)
+        memory_budget_mb (float): working memory for one block of items
+        dtype: dtype of the result
+        out (np.ndarray): optional (users, items) array to fill, e.g. a np.memmap
+
+    Returns:
+        np.ndarray: (users, items) scores
+    """
+    matrix = sparse.csr_matrix(matrix, dtype=np.float64)
+    item_vectors = normalize(matrix, norm='l2', axis=0).T.tocsr()
+    return _cf_scores(item_vectors, matrix, top_k, memory_budget_mb, dtype, out, transpose=True)
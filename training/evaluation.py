@@ -0,0 +1,164 @@
+"""
+Ranking metrics over many query groups at once.
+
+Rows are flat ``(y_true, y_pred)`` arrays with LightGBM-style ``group`` sizes
+(consecutive rows belong to the same user). Instead of calling
+``sklearn.metrics.ndcg_score`` once per group, all groups are sorted together
+with one ``lexsort`` and per-group sums are taken with ``np.add.reduceat``
+and ``np.bincount``. ``evaluate`` reports NDCG@k, MAP@k, recall@k and
+catalog coverage for a whole evaluation set in one call.
+"""
+
+import numpy as np
+
+
+def group_ids(group):
+    """Group index of every row, from consecutive group sizes"""
+    group = np.asarray(group, dtype=np.int64)
+    return np.repeat(np.arange(len(group)), group)
+
+
+def _ranks(gid, order, group):
+    """Position within its group of every row of a group-sorted order"""
+    starts = np.concatenate([[0], np.cumsum(group)[:-1]])
+    return np.arange(len(order)) - starts[gid[order]]
+
+
+def _discounts(ranks, k):
+    """1 / log2(rank + 2), zero beyond the cutoff k"""
+    discounts = 1.0 / np.log2(ranks + 2.0)
+    if k is not None:
+        discounts[ranks >= k] = 0.0
+    return discounts
+
+
+def ndcg_at_k(y_true, y_pred, group, k=None):
+    """
+    NDCG@k per group, matching ``sklearn.metrics.ndcg_score`` (linear gains, tied predictions averaged).
+
+    Groups without any relevant item score 0.
+
+    Args:
+        y_true (np.ndarray): relevance per row
+        y_pred (np.ndarray): predicted score per row
+        group (array-like): consecutive group sizes, summing to len(y_true)
+        k (int): cutoff (None = whole group)
+
+    Returns:
+        np.ndarray: NDCG per group
+    """
+    y_true = np.asarray(y_true, dtype=np.float64)
+    y_pred = np.asarray(y_pred, dtype=np.float64)
+    group = np.asarray(group, dtype=np.int64)
+    gid = group_ids(group)
+    n_groups = len(group)
+
+    # DCG: runs of equal predictions within a group share the mean gain of the run
+    order = np.lexsort((-y_pred, gid))
+    discounts = _discounts(_ranks(gid, order, group), k)
+    sorted_gid, sorted_pred = gid[order], y_pred[order]
+    run_starts = np.flatnonzero(np.concatenate([
+        [True], (sorted_gid[1:] != sorted_gid[:-1]) | (sorted_pred[1:] != sorted_pred[:-1]),
+    ]))
+    run_lengths = np.diff(np.append(run_starts, len(order)))
+    run_gain = np.add.reduceat(y_true[order], run_starts) / run_lengths
+    run_discount = np.add.reduceat(discounts, run_starts)
+    dcg = np.bincount(sorted_gid[run_starts], weights=run_gain * run_discount, minlength=n_groups)
+
+    # Ideal DCG: rows sorted by relevance
+    ideal_order = np.lexsort((-y_true, gid))
+    ideal_discounts = _discounts(_ranks(gid, ideal_order, group), k)
+    idcg = np.bincount(gid[ideal_order], weights=y_true[ideal_order] * ideal_discounts, minlength=n_groups)
+
+    ndcg = np.zeros(n_groups)
+    relevant = idcg > 0
+    ndcg[relevant] = dcg[relevant] / idcg[relevant]
+    return ndcg
+
+
+def _ranked(y_pred, group):
+    """(group id per row, rows sorted by group then prediction descending, rank of each sorted row)"""
+    group = np.asarray(group, dtype=np.int64)
+    gid = group_ids(group)
+    order = np.lexsort((-np.asarray(y_pred, dtype=np.float64), gid))
+    return gid, order, _ranks(gid, order, group)
+
+
+def _hit_counts(y_true, y_pred, group, k, relevance_threshold):
+    """Per sorted row: group id, relevant flag, within top k flag, relevant rows up to and including it"""
+    gid, order, ranks = _ranked(y_pred, group)
+    sorted_gid = gid[order]
+    relevant = np.asarray(y_true)[order] >= relevance_threshold
+    in_top = ranks < k if k is not None else np.ones(len(order), dtype=bool)
+
+    cumulative = np.cumsum(relevant)
+    starts = np.concatenate([[0], np.cumsum(group)[:-1]]).astype(np.int64)
+    before_group = np.concatenate([[0], cumulative])[starts]
+    hits = cumulative - before_group[sorted_gid]
+    return sorted_gid, relevant, in_top, hits, ranks
+
+
+def map_at_k(y_true, y_pred, group, k=None, relevance_threshold=1):
+    """
+    Average precision@k per group; relevant rows have y_true >= relevance_threshold.
+
+    AP is normalized by min(k, relevant rows in the group); groups without relevant rows score 0.
+    """
+    group = np.asarray(group, dtype=np.int64)
+    sorted_gid, relevant, in_top, hits, ranks = _hit_counts(y_true, y_pred, group, k, relevance_threshold)
+    precision = hits / (ranks + 1.0)
+    ap_sum = np.bincount(sorted_gid, weights=precision * (relevant & in_top), minlength=len(group))
+    n_relevant = np.bincount(sorted_gid, weights=relevant, minlength=len(group))
+    denominator = n_relevant if k is None else np.minimum(n_relevant, k)
+
+    ap = np.zeros(len(group))
+    nonzero = denominator > 0
+    ap[nonzero] = ap_sum[nonzero] / denominator[nonzero]
+    return ap
+
+
+def recall_at_k(y_true, y_pred, group, k=None, relevance_threshold=1):
+    """Share of each group's relevant rows ranked in its top k (0 for groups without relevant rows)"""
+    group = np.asarray(group, dtype=np.int64)
+    sorted_gid, relevant, in_top, _, _ = _hit_counts(y_true, y_pred, group, k, relevance_threshold)
+    found = np.bincount(sorted_gid, weights=relevant & in_top, minlength=len(group))
+    n_relevant = np.bincount(sorted_gid, weights=relevant, minlength=len(group))
+
+    recall = np.zeros(len(group))
+    nonzero = n_relevant > 0
+    recall[nonzero] = found[nonzero] / n_relevant[nonzero]
+    return recall
+
+
+def coverage_at_k(item_ids, y_pred, group, k=10):
+    """Share of distinct items that appear in at least one group's top k"""
+    item_ids = np.asarray(item_ids)
+    _, order, ranks = _ranked(y_pred, group)
+    recommended = item_ids[order[ranks < k]] if k is not None else item_ids
+    return len(np.unique(recommended)) / max(len(np.unique(item_ids)), 1)
+
+
+def evaluate(y_true, y_pred, group, k=10, relevance_threshold=1, item_ids=None):
+    """
+    Mean ranking metrics over all groups.
+
+    Args:
+        y_true (np.ndarray): relevance per row (e.g. the rating, 0 if unrated)
+        y_pred (np.ndarray): predicted score per row
+        group (array-like): consecutive group sizes
+        k (int): cutoff
+        relevance_threshold (float): minimum y_true counted as relevant for MAP and recall
+        item_ids (np.ndarray): item per row; adds catalog coverage when given
+
+    Returns:
+        dict: metric name -> value
+    """
+    suffix = f"@{k}" if k is not None else ""
+    metrics = {
+        f"ndcg{suffix}": float(ndcg_at_k(y_true, y_pred, group, k).mean()),
+        f"map{suffix}": float(map_at_k(y_true, y_pred, group, k, relevance_threshold).mean()),
+        f"recall{suffix}": float(recall_at_k(y_true, y_pred, group, k, relevance_threshold).mean()),
+    }
+    if item_ids is not None:
+        metrics[f"coverage{suffix}"] = float(coverage_at_k(item_ids, y_pred, group, k))
+    return metrics
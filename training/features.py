@@ -0,0 +1,63 @@
+"""
+Vectorized training-set construction for the LTR model.
+
+``create_feature_matrix`` used to loop over every user and place with scalar
+pandas lookups. Here the users x places feature tensor is assembled from
+aligned NumPy arrays instead: the three score matrices are reindexed once to
+(users, places), per-place attributes are broadcast over users, ages over
+places, and the age/price interaction is computed with masks. Rows come out
+user by user, places in ``places_list`` order, exactly as before.
+"""
+
+import numpy as np
+
+from ltr_features import FEATURE_COLUMNS, age_price_interaction
+
+
+def label_matrix(ratings_df, users_list, places_list):
+    """Rating given by each user to each place (0 if unrated, the last rating if rated twice)"""
+    ratings = ratings_df.drop_duplicates(['User_Id', 'Place_Id'], keep='last')
+    labels = ratings.pivot(index='User_Id', columns='Place_Id', values='Place_Ratings')
+    labels = labels.reindex(index=users_list, columns=places_list)
+    return labels.fillna(0).to_numpy(dtype=ratings['Place_Ratings'].dtype)
+
+
+def create_feature_matrix(users_list, places_list, ratings_df, users_df, places_df,
+                          content_scores_df, user_cf_scores_df, item_cf_scores_df):
+    """
+    LTR training set for every (user, place) pair.
+
+    Args:
+        users_list (array-like): user ids, one query group each
+        places_list (array-like): place ids, scored for every user in this order
+        ratings_df (pd.DataFrame): User_Id/Place_Id/Place_Ratings (labels)
+        users_df (pd.DataFrame): users with User_Id/Age
+        places_df (pd.DataFrame): places with Place_Id, Rating, Price, encoded
+            Category/City and price_category
+        content_scores_df, user_cf_scores_df, item_cf_scores_df (pd.DataFrame):
+            user x place score matrices (index User_Id, columns Place_Id)
+
+    Returns:
+        tuple: (X of shape (users * places, len(FEATURE_COLUMNS)), y, groups)
+
+    Raises:
+        KeyError: if a user or place is missing from the inputs
+    """
+    users_list = np.asarray(users_list)
+    places_list = np.asarray(places_list)
+    n_users, n_places = len(users_list), len(places_list)
+
+    ages = users_df.set_index('User_Id').loc[users_list, 'Age'].to_numpy()
+    places = places_df.set_index('Place_Id').loc[places_list]
+
+    features = np.empty((n_users, n_places, len(FEATURE_COLUMNS)), dtype=np.float64)
+    for column, scores_df in enumerate((content_scores_df, user_cf_scores_df, item_cf_scores_df)):
+        features[:, :, column] = scores_df.loc[users_list, places_list].to_numpy(dtype=np.float64)
+    features[:, :, 3] = ages[:, None]
+    features[:, :, 4:8] = places[['Rating', 'Price', 'Category', 'City']].to_numpy(dtype=np.float64)[None, :, :]
+    features[:, :, 8] = age_price_interaction(ages, places['price_category'].to_numpy())
+
+    X = features.reshape(n_users * n_places, len(FEATURE_COLUMNS))
+    y = label_matrix(ratings_df, users_list, places_list).reshape(-1)
+    groups = np.full(n_users, n_places)
+    return X, y, groups
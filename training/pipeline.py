@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Headless training pipeline that produces the serving bundle.
+
+Runs the steps of ``notebooks/Model.ipynb`` as stages:
+
+    prepare   read the CSVs, price tiers, label encoders, merged ratings
+    content   TF-IDF user profiles -> content scores
+    cf        sparse user-CF and item-CF scores (training.cf)
+    features  LTR feature matrix (training.features)
+    tune      parallel random search (training.tuning)
+    fit       final LGBMRanker on all users
+    evaluate  NDCG/MAP/recall/coverage on held-out users (training.evaluation)
+    export    versioned bundle under api/model/bundle (and optionally the pickle)
+
+Every stage result is cached on disk under a key hashed from the input CSV
+contents, the keys of the stages it depends on and its own settings, so a
+rerun only recomputes stages whose inputs changed. With ``--no-tune`` the
+parameters of the last search are reused, so retraining after a small
+ratings change skips the search entirely.
+
+    train [--data-dir data] [--model-dir api/model] [--no-tune] [--jobs N]
+    python -m training.pipeline ...
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API_DIR = os.path.join(REPO_ROOT, "api")
+# Default paths are relative to the checkout, or to the working directory for an installed `train`
+DEFAULT_ROOT = REPO_ROOT if os.path.isdir(API_DIR) else os.getcwd()
+
+DATA_FILES = {
+    "rating": "tourism_rating.csv",
+    "places": "tourism_with_id.csv",
+    "users": "user.csv",
+}
+STAGES = ["prepare", "content", "cf", "features", "tune", "fit", "evaluate", "export"]
+
+PRICE_BINS = [-1, 25000, 100000, np.inf]
+PRICE_LABELS = ['murah', 'menengah', 'mahal']
+TFIDF_MAX_FEATURES = 100
+LIKED_RATING = 4
+
+PARAM_DIST = {
+    'n_estimators': [100, 200, 300, 400],
+    'learning_rate': [0.01, 0.05, 0.1],
+    'num_leaves': [20, 31, 40, 50],
+    'max_depth': [-1, 5, 10, 15],
+    'reg_alpha': [0.1, 0.5, 1.0],
+    'reg_lambda': [0.1, 0.5, 1.0],
+}
+RANDOM_STATE = 42
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def stage_key(stage, *parts):
+    """Cache key of a stage from its upstream keys and settings"""
+    payload = json.dumps([stage, *parts], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+class StageCache:
+    """Pickled stage results under ``<root>/<stage>/<key>.pkl``"""
+
+    def __init__(self, root, force=()):
+        self.root = root
+        self.force = set(force)
+
+    def path(self, stage, key):
+        return os.path.join(self.root, stage, f"{key}.pkl")
+
+    def run(self, stage, key, fn, *args):
+        """Load a stage result from the cache, or compute and store it"""
+        path = self.path(stage, key)
+        if stage not in self.force and os.path.exists(path):
+            with open(path, "rb") as f:
+                result = pickle.load(f)
+            print(f"[{stage}] cached ({key})")
+            return result
+
+        started = time.perf_counter()
+        result = fn(*args)
+        self.save(path, result)
+        print(f"[{stage}] done in {time.perf_counter() - started:.1f}s ({key})")
+        return result
+
+    @staticmethod
+    def save(path, value):
+        # Write to a temporary file first so an interrupted run never leaves a truncated entry
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+
+def prepare(data_dir):
+    """CSV tables, places with price tiers and encoded Category/City, merged ratings"""
+    from sklearn.preprocessing import LabelEncoder
+
+    rating = pd.read_csv(os.path.join(data_dir, DATA_FILES["rating"]))
+    id_tourism = pd.read_csv(os.path.join(data_dir, DATA_FILES["places"]))
+    users = pd.read_csv(os.path.join(data_dir, DATA_FILES["users"]))
+
+    places = id_tourism[['Place_Id', 'Place_Name', 'Description', 'Category', 'City', 'Price', 'Rating']].copy()
+    places['price_category'] = pd.cut(places['Price'], bins=PRICE_BINS, labels=PRICE_LABELS)
+
+    encoders = {}
+    for col in ['Category', 'City']:
+        places[f'{col}_name'] = places[col]
+        encoder = LabelEncoder()
+        places[col] = encoder.fit_transform(places[col].astype(str))
+        encoders[col] = encoder
+
+    df = rating.merge(users, on="User_Id").merge(places, on="Place_Id")
+    return {"rating": rating, "users": users, "places": places, "encoders": encoders, "df": df}
+
+
+def content_scores(prepared):
+    """Cosine similarity between each user's liked-place TF-IDF profile and every place"""
+    from scipy import sparse
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    df, places = prepared["df"], prepared["places"]
+    tfidf_matrix = TfidfVectorizer(max_features=TFIDF_MAX_FEATURES).fit_transform(places['Description'].fillna(""))
+
+    # Profile = mean TF-IDF vector of the places a user rated LIKED_RATING or higher (zeros if none)
+    user_ids = df['User_Id'].unique()
+    liked = df.loc[df['Place_Ratings'] >= LIKED_RATING, ['User_Id', 'Place_Id']].drop_duplicates()
+    rows = pd.Index(user_ids).get_indexer(liked['User_Id'])
+    cols = pd.Index(places['Place_Id']).get_indexer(liked['Place_Id'])
+    liked_matrix = sparse.csr_matrix(
+        (np.ones(len(rows)), (rows, cols)), shape=(len(user_ids), len(places))
+    )
+    counts = np.asarray(liked_matrix.sum(axis=1)).ravel()
+    profiles = np.asarray((liked_matrix @ tfidf_matrix).todense())
+    profiles[counts > 0] /= counts[counts > 0, None]
+
+    return pd.DataFrame(cosine_similarity(profiles, tfidf_matrix), index=user_ids, columns=places['Place_Id'])
+
+
+def cf_scores(prepared):
+    """User-CF and item-CF score frames from the sparse CF engine"""
+    from training.cf import interaction_matrix, item_cf_scores, user_cf_scores
+
+    matrix, user_ids, place_ids = interaction_matrix(prepared["df"])
+    return (
+        pd.DataFrame(user_cf_scores(matrix), index=user_ids, columns=place_ids),
+        pd.DataFrame(item_cf_scores(matrix), index=user_ids, columns=place_ids),
+    )
+
+
+def build_features(prepared, content, cf):
+    """X, y, group over every (user, place) pair, with the user and place orders used"""
+    from training.features import create_feature_matrix
+
+    df, places = prepared["df"], prepared["places"]
+    all_users = df['User_Id'].unique()
+    all_places = places['Place_Id'].unique()
+    X, y, group = create_feature_matrix(
+        all_users, all_places, df, prepared["users"], places, content, cf[0], cf[1],
+    )
+    return {"X": X, "y": y, "group": group, "all_users": all_users, "all_places": all_places}
+
+
+def tune(features, n_iter, n_splits, k, n_jobs):
+    """Best LGBMRanker parameters from the parallel random search"""
+    from training.tuning import random_search
+
+    search = random_search(
+        features["X"], features["y"], features["group"], PARAM_DIST,
+        n_iter=n_iter, n_splits=n_splits, k=k, n_jobs=n_jobs, random_state=RANDOM_STATE,
+    )
+    print(f"[tune] best NDCG {search.best_score:.4f} with {search.best_params}")
+    return search.best_params
+
+
+def fit(features, params, rows=None, group=None):
+    """LGBMRanker fitted on all rows (or the given rows and their group sizes)"""
+    from lightgbm import LGBMRanker
+
+    X, y = features["X"], features["y"]
+    if rows is not None:
+        X, y = X[rows], y[rows]
+    model = LGBMRanker(objective='lambdarank', metric='ndcg', random_state=RANDOM_STATE, verbose=-1, **params)
+    model.fit(X, y, group=features["group"] if group is None else group)
+    return model
+
+
+def evaluate_holdout(features, params, holdout, k):
+    """Ranking metrics of a model fitted without a random share of users, on those users"""
+    from training.evaluation import evaluate, group_ids
+
+    group = np.asarray(features["group"], dtype=np.int64)
+    gid = group_ids(group)
+    rng = np.random.default_rng(RANDOM_STATE)
+    test_groups = np.sort(rng.choice(len(group), max(1, int(round(len(group) * holdout))), replace=False))
+    is_test = np.isin(gid, test_groups)
+    train_groups = np.setdiff1d(np.arange(len(group)), test_groups)
+
+    model = fit(features, params, np.flatnonzero(~is_test), group[train_groups])
+    test_rows = np.flatnonzero(is_test)
+    item_ids = np.tile(features["all_places"], len(group))[test_rows]
+    metrics = evaluate(
+        features["y"][test_rows], model.predict(features["X"][test_rows]), group[test_groups],
+        k=k, item_ids=item_ids,
+    )
+    print("[evaluate] " + ", ".join(f"{name} {value:.4f}" for name, value in metrics.items()))
+    return metrics
+
+
+def export(key, prepared, content, cf, features, model, metrics, model_dir, write_pickle):
+    """Write the serving bundle (reusing an existing bundle of the same key) and point LATEST at it"""
+    from model_bundle import LEGACY_PICKLE_FILENAME, save_bundle, set_latest_version
+
+    root = os.path.join(model_dir, "bundle")
+    existing = sorted(
+        name for name in (os.listdir(root) if os.path.isdir(root) else [])
+        if name.endswith(f"-{key}") and os.path.exists(os.path.join(root, name, "manifest.json"))
+    )
+    if existing and not write_pickle:
+        set_latest_version(root, existing[-1])
+        print(f"[export] cached: {os.path.join(root, existing[-1])}")
+        return
+
+    all_users, all_places = features["all_users"], features["all_places"]
+
+    def export_score_matrix(scores_df):
+        # float32, rows in all_users order and columns in places order (see api/personalization.py)
+        return scores_df.reindex(index=all_users, columns=all_places).to_numpy(dtype=np.float32)
+
+    artifacts = {
+        "ltr_model": model, "encoders": prepared["encoders"], "X_full": features["X"],
+        "all_users": all_users, "places_df": prepared["places"], "users_df": prepared["users"],
+        "content_scores": export_score_matrix(content),
+        "user_cf_scores": export_score_matrix(cf[0]),
+        "item_cf_scores": export_score_matrix(cf[1]),
+        "ratings_df": prepared["rating"][['User_Id', 'Place_Id', 'Place_Ratings']],
+    }
+
+    if write_pickle:
+        pickle_path = os.path.join(model_dir, LEGACY_PICKLE_FILENAME)
+        StageCache.save(pickle_path, artifacts)
+        print(f"[export] pickle: {pickle_path}")
+
+    if existing:
+        set_latest_version(root, existing[-1])
+        path = os.path.join(root, existing[-1])
+    else:
+        version = f"{datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')}-{key}"
+        path = save_bundle(artifacts, root, version=version)
+    with open(os.path.join(path, "metrics.json"), "w") as f:
+        json.dump(metrics, f, indent=2)
+    print(f"[export] bundle: {path}")
+
+
+def run(data_dir, model_dir, cache_dir, n_iter=10, n_splits=5, k=None, eval_k=10, holdout=0.2,
+        n_jobs=None, no_tune=False, force=(), write_pickle=False):
+    """Run every stage, reusing cached results whose inputs did not change"""
+    cache = StageCache(cache_dir, force)
+    digests = {name: file_digest(os.path.join(data_dir, filename)) for name, filename in DATA_FILES.items()}
+
+    prepare_key = stage_key("prepare", digests, PRICE_BINS, PRICE_LABELS)
+    prepared = cache.run("prepare", prepare_key, prepare, data_dir)
+
+    content_key = stage_key("content", prepare_key, TFIDF_MAX_FEATURES, LIKED_RATING)
+    content = cache.run("content", content_key, content_scores, prepared)
+
+    cf_key = stage_key("cf", prepare_key)
+    cf = cache.run("cf", cf_key, cf_scores, prepared)
+
+    features_key = stage_key("features", content_key, cf_key)
+    features = cache.run("features", features_key, build_features, prepared, content, cf)
+
+    # The latest search result is kept under a fixed name so --no-tune can reuse it on new data
+    latest_params = os.path.join(cache_dir, "tune", "latest.json")
+    if no_tune:
+        params = {}
+        if os.path.exists(latest_params):
+            with open(latest_params) as f:
+                params = json.load(f)
+        print(f"[tune] skipped, using {params or 'LightGBM defaults'}")
+    else:
+        tune_key = stage_key("tune", features_key, PARAM_DIST, n_iter, n_splits, k, RANDOM_STATE)
+        params = cache.run("tune", tune_key, tune, features, n_iter, n_splits, k, n_jobs)
+        os.makedirs(os.path.dirname(latest_params), exist_ok=True)
+        with open(latest_params, "w") as f:
+            json.dump(params, f, indent=2, default=int)
+
+    fit_key = stage_key("fit", features_key, params, RANDOM_STATE)
+    model = cache.run("fit", fit_key, fit, features, params)
+
+    evaluate_key = stage_key("evaluate", fit_key, holdout, eval_k)
+    metrics = cache.run("evaluate", evaluate_key, evaluate_holdout, features, params, holdout, eval_k)
+
+    export(stage_key("export", fit_key, evaluate_key), prepared, content, cf, features, model, metrics,
+           model_dir, write_pickle)
+    return metrics
+
+
+def main():
+    # Allow running the file directly (python training/pipeline.py) as well as the installed script
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+
+    parser = argparse.ArgumentParser(description="Train the LTR recommendation model and export the serving bundle")
+    parser.add_argument("--data-dir", default=os.path.join(DEFAULT_ROOT, "data"))
+    parser.add_argument("--model-dir", default=os.path.join(DEFAULT_ROOT, "api", "model"))
+    parser.add_argument("--cache-dir", default=os.path.join(DEFAULT_ROOT, ".train_cache"))
+    parser.add_argument("--n-iter", type=int, default=10, help="parameter sets tried by the search")
+    parser.add_argument("--n-splits", type=int, default=5, help="GroupKFold splits")
+    parser.add_argument("--k", type=int, default=None, help="NDCG cutoff for tuning (default: whole list)")
+    parser.add_argument("--eval-k", type=int, default=10, help="cutoff of the hold-out metrics")
+    parser.add_argument("--holdout", type=float, default=0.2, help="share of users held out for evaluation")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes for the search")
+    parser.add_argument("--no-tune", action="store_true", help="reuse the parameters of the last search")
+    parser.add_argument("--force", nargs="*", default=[], choices=STAGES[:-1], help="recompute these stages")
+    parser.add_argument("--pickle", action="store_true", help="also write the legacy pickle")
+    args = parser.parse_args()
+
+    run(
+        args.data_dir, args.model_dir, args.cache_dir,
+        n_iter=args.n_iter, n_splits=args.n_splits, k=args.k, eval_k=args.eval_k, holdout=args.holdout,
+        n_jobs=args.jobs, no_tune=args.no_tune, force=args.force, write_pickle=args.pickle,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Parallel random search for the LGBMRanker.
+
+Every (parameter set, fold) pair is an independent job, so the search runs
+them concurrently on a process pool instead of one fit after another. The
+feature matrix is handed to each worker once through the pool initializer,
+fold indices and group sizes are computed once up front, and each fit stops
+early on a held-out validation slice of the training users. Folds are scored
+with the vectorized grouped metrics from ``training.evaluation``; NDCG picks
+the winner, MAP and recall are reported alongside.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+from sklearn.model_selection import GroupKFold, ParameterSampler
+
+from training.evaluation import evaluate, group_ids
+
+EARLY_STOPPING_ROUNDS = 20
+VALIDATION_FRACTION = 0.1
+
+
+@dataclass(frozen=True)
+class Fold:
+    """Row indices and consecutive group sizes of one cross-validation split"""
+    train_idx: np.ndarray
+    train_group: np.ndarray
+    valid_idx: np.ndarray
+    valid_group: np.ndarray
+    test_idx: np.ndarray
+    test_group: np.ndarray
+
+
+@dataclass
+class SearchResult:
+    """Outcome of a random search; best_params has n_estimators set from early stopping"""
+    best_params: dict
+    best_score: float
+    results: list = field(default_factory=list)  # {'params', 'score', 'metrics', 'best_iteration'} per parameter set
+
+
+def _rows(gid, group, groups):
+    """Row indices and group sizes of the given (sorted) groups"""
+    return np.flatnonzero(np.isin(gid, groups)), group[groups]
+
+
+def make_folds(group, n_splits=5, validation_fraction=VALIDATION_FRACTION, random_state=42):
+    """
+    GroupKFold splits over consecutive groups, each with a validation slice of the training groups.
+
+    Args:
+        group (array-like): consecutive group sizes
+        n_splits (int): number of folds
+        validation_fraction (float): share of training groups held out for early stopping
+
+    Returns:
+        list: one Fold per split
+    """
+    group = np.asarray(group, dtype=np.int64)
+    gid = group_ids(group)
+    rng = np.random.default_rng(random_state)
+
+    folds = []
+    for train_groups, test_groups in GroupKFold(n_splits=n_splits).split(group, groups=np.arange(len(group))):
+        n_valid = max(1, int(round(len(train_groups) * validation_fraction)))
+        valid_groups = np.sort(rng.choice(train_groups, n_valid, replace=False))
+        train_groups = np.setdiff1d(train_groups, valid_groups)
+        folds.append(Fold(
+            *_rows(gid, group, train_groups),
+            *_rows(gid, group, valid_groups),
+            *_rows(gid, group, np.sort(test_groups)),
+        ))
+    return folds
+
+
+# Per-process state set by the pool initializer
+_worker_data = {}
+
+
+def _init_worker(X, y, folds):
+    _worker_data.update(X=X, y=y, folds=folds)
+
+
+def _fit_fold(job):
+    """Fit one parameter set on one fold; returns (param index, fold index, metrics, best iteration)"""
+    from lightgbm import LGBMRanker, early_stopping
+
+    param_idx, fold_idx, params, k, early_stopping_rounds, random_state = job
+    X, y, fold = _worker_data["X"], _worker_data["y"], _worker_data["folds"][fold_idx]
+    eval_at = k or int(fold.valid_group.max())
+
+    model = LGBMRanker(objective='lambdarank', random_state=random_state, n_jobs=1, verbose=-1, **params)
+    model.fit(
+        X[fold.train_idx], y[fold.train_idx], group=fold.train_group,
+        eval_set=[(X[fold.valid_idx], y[fold.valid_idx])], eval_group=[fold.valid_group],
+        eval_at=[eval_at], callbacks=[early_stopping(early_stopping_rounds, verbose=False)],
+    )
+    y_pred = model.predict(X[fold.test_idx])
+    metrics = evaluate(y[fold.test_idx], y_pred, fold.test_group, k)
+    return param_idx, fold_idx, metrics, int(model.best_iteration_ or params.get('n_estimators', 100))
+
+
+def random_search(X, y, group, param_dist, n_iter=10, n_splits=5, k=None, n_jobs=None,
+                  early_stopping_rounds=EARLY_STOPPING_ROUNDS, random_state=42, verbose=True):
+    """
+    Random search over LGBMRanker parameters with grouped cross-validation.
+
+    Args:
+        X, y (np.ndarray): features and relevance labels, rows grouped by user
+        group (array-like): consecutive group sizes
+        param_dist (dict): parameter lists to sample from (see ParameterSampler)
+        n_iter (int): parameter sets to try
+        n_splits (int): GroupKFold splits
+        k (int): NDCG cutoff (None = whole group, like sklearn's ndcg_score)
+        n_jobs (int): worker processes (defaults to the CPU count)
+        early_stopping_rounds (int): rounds without validation improvement before a fit stops
+
+    Returns:
+        SearchResult
+    """
+    X, y = np.asarray(X), np.asarray(y)
+    folds = make_folds(group, n_splits, random_state=random_state)
+    param_sets = list(ParameterSampler(param_dist, n_iter=n_iter, random_state=random_state))
+    jobs = [
+        (param_idx, fold_idx, params, k, early_stopping_rounds, random_state)
+        for param_idx, params in enumerate(param_sets)
+        for fold_idx in range(len(folds))
+    ]
+
+    fold_metrics = [[None] * len(folds) for _ in param_sets]
+    iterations = np.zeros((len(param_sets), len(folds)), dtype=np.int64)
+    n_jobs = min(n_jobs or os.cpu_count() or 1, len(jobs))
+    with ProcessPoolExecutor(n_jobs, initializer=_init_worker, initargs=(X, y, folds)) as pool:
+        for param_idx, fold_idx, metrics, best_iteration in pool.map(_fit_fold, jobs):
+            fold_metrics[param_idx][fold_idx] = metrics
+            iterations[param_idx, fold_idx] = best_iteration
+
+    results = []
+    for param_idx, params in enumerate(param_sets):
+        metrics = {
+            name: float(np.mean([fold[name] for fold in fold_metrics[param_idx]]))
+            for name in fold_metrics[param_idx][0]
+        }
+        result = {
+            'params': params,
+            'score': metrics[f"ndcg@{k}" if k is not None else "ndcg"],
+            'metrics': metrics,
+            'best_iteration': int(round(iterations[param_idx].mean())),
+        }
+        results.append(result)
+        if verbose:
+            summary = ", ".join(f"{name} {value:.4f}" for name, value in metrics.items())
+            print(f"{params} -> {summary} ({result['best_iteration']} iterations)")
+
+    best = max(results, key=lambda result: result['score'])
+    best_params = {**best['params'], 'n_estimators': best['best_iteration']}
+    return SearchResult(best_params, best['score'], results)
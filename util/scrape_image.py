@@ -400,11 +400,25 @@ class TourismImageScraper:
             self.print_stats()
             logger.info(f"{'='*60}")
             
+            self.write_image_manifest()
+            
         except FileNotFoundError:
             logger.error(f"❌ File {csv_file} tidak ditemukan!")
         except Exception as e:
             logger.error(f"❌ Error in scrape_all_places: {str(e)}")
 
+    def write_image_manifest(self):
+        """Tulis image/manifest.json (Place_Id -> file gambar + dimensi) untuk website"""
+        import sys
+        sys.path.append(str(Path(__file__).resolve().parent.parent / "website"))
+        from image_manifest import write_manifest
+        
+        try:
+            path = write_manifest(str(self.image_dir))
+            logger.info(f"🗂️  Image manifest written to {path}")
+        except Exception as e:
+            logger.error(f"❌ Error writing image manifest: {str(e)}")
+
     def print_stats(self):
         """Print statistik scraping"""
         logger.info(f"""
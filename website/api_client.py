@@ -0,0 +1,109 @@
+"""
+HTTP client for the ExploreIndonesia API.
+
+One ``requests.Session`` per Streamlit server keeps a pool of keep-alive
+connections to the API instead of opening a new TCP connection per call.
+Identical calls that are already in flight (several sessions rerunning the
+same page at once) are coalesced: the first caller does the request and the
+others wait for its result. Memoization across reruns is done in the app
+with ``st.cache_data`` on top of this client.
+"""
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class ApiError(Exception):
+    """API call failed: connection error or non-2xx response"""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def normalize_params(params):
+    """Query parameters without empty values, as a hashable sorted tuple"""
+    return tuple(sorted((key, value) for key, value in (params or {}).items() if value not in (None, "", [])))
+
+
+class _InFlight:
+    """Result slot shared by coalesced callers"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class ApiClient:
+    """Pooled JSON client with in-flight request coalescing"""
+
+    def __init__(self, base_url, timeout=10, pool_size=20, retries=2):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        # Retry only failed connects/reads of idempotent GETs, never on an HTTP error status
+        retry = Retry(total=retries, connect=retries, read=retries, status=0,
+                      backoff_factor=0.2, allowed_methods=frozenset({"GET"}))
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def get_json(self, path, params=None):
+        """
+        GET ``path`` and return the decoded JSON body.
+
+        Raises:
+            ApiError: on connection errors or a non-2xx status
+        """
+        return self._get(path, params)[0]
+
+    def get_page(self, path, params=None):
+        """GET a paginated list; returns (items, total) with total from the X-Total-Count header"""
+        items, total = self._get(path, params)
+        return items, len(items) if total is None else total
+
+    def _get(self, path, params):
+        """(body, X-Total-Count or None), sharing the result with identical in-flight calls"""
+        key = (path, normalize_params(params))
+        with self._lock:
+            pending = self._in_flight.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._in_flight[key] = _InFlight()
+
+        if not owner:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.result
+
+        try:
+            pending.result = self._request(path, dict(key[1]))
+        except Exception as e:
+            pending.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            pending.done.set()
+        return pending.result
+
+    def _request(self, path, params):
+        try:
+            response = self.session.get(f"{self.base_url}{path}", params=params, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            raise ApiError(f"Tidak dapat terhubung ke API: {e}") from e
+        if not response.ok:
+            raise ApiError(f"API Error: {response.status_code} - {response.text}", response.status_code)
+        try:
+            body = response.json()
+        except ValueError as e:
+            raise ApiError(f"Invalid API response: {e}", response.status_code) from e
+        total = response.headers.get("X-Total-Count")
+        return body, int(total) if total is not None else None
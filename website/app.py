@@ -1,8 +1,13 @@
 import streamlit as st
-import requests
 import os
+import html
+from urllib.parse import quote
 from PIL import Image
 from streamlit_option_menu import option_menu
+from image_manifest import ImageManifest
+from image_loader import ImageLoader
+from api_client import ApiClient, ApiError, normalize_params
+from build_thumbnails import CARD_SIZE, THUMBNAIL_SIZES, thumbnail_path
 
 # Carousel removed for production stability
 
@@ -16,6 +21,11 @@ st.set_page_config(
 
 # API Configuration
 API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
+# Seconds an identical API query is served from the Streamlit cache without a round trip
+API_CACHE_TTL = int(os.getenv("WEB_API_CACHE_TTL", "60"))
+IMAGE_BASE = os.getenv("IMAGE_DIR", "/app/image")
+# Public URL prefix of IMAGE_BASE when a static server (nginx /images/) serves it; empty = send via st.image
+IMAGE_BASE_URL = os.getenv("IMAGE_BASE_URL", "").rstrip("/")
 
 # Real Indonesian cities from data with coordinates and destination counts
 INDONESIAN_CITIES = {
@@ -285,6 +295,23 @@ st.markdown("""
         transition: transform 0.3s ease;
     }
     
+    /* Card images served by URL (IMAGE_BASE_URL), same sizing as st.image cards */
+    img.destination-image {
+        display: block;
+        width: 100%;
+        height: 200px;
+        object-fit: cover;
+        border-radius: 10px 10px 0 0;
+    }
+    
+    @media (max-width: 768px) {
+        img.destination-image { height: 160px; }
+    }
+    
+    @media (max-width: 480px) {
+        img.destination-image { height: 140px; }
+    }
+    
     .destination-image:hover {
         transform: scale(1.02);
     }
@@ -298,72 +325,135 @@ def format_price(price):
         return "Gratis"
     return f"Rp {price:,.0f}".replace(",", ".")
 
+@st.cache_resource
+def get_image_manifest():
+    """Image manifest for IMAGE_BASE, built once per server process"""
+    return ImageManifest.load(IMAGE_BASE)
+
+@st.cache_resource
+def get_image_loader():
+    """Thread-pool card image loader with an LRU byte cache, shared by all sessions"""
+    return ImageLoader(get_image_manifest())
+
 def get_destination_images(place_name, place_id=None, max_images=5):
     """Get multiple image paths for a destination"""
-    image_base = "/app/image"
-    images = []
-    
-    if place_id:
-        folder_pattern = f"{place_id:03d}_"
-        for folder in os.listdir(image_base) if os.path.exists(image_base) else []:
-            if folder.startswith(folder_pattern):
-                folder_images = [f for f in os.listdir(os.path.join(image_base, folder)) if f.endswith('.jpg')]
-                if folder_images:
-                    # Sort to get consistent order
-                    folder_images.sort()
-                    for img in folder_images[:max_images]:
-                        images.append(os.path.join(image_base, folder, img))
-                    break
-    
-    if not images:
-        place_normalized = place_name.replace(" ", "_").replace("(", "").replace(")", "")
-        if os.path.exists(image_base):
-            for folder in os.listdir(image_base):
-                if place_normalized.lower() in folder.lower():
-                    folder_images = [f for f in os.listdir(os.path.join(image_base, folder)) if f.endswith('.jpg')]
-                    if folder_images:
-                        folder_images.sort()
-                        for img in folder_images[:max_images]:
-                            images.append(os.path.join(image_base, folder, img))
-                        break
-    
-    return images if images else []
+    return get_image_manifest().paths(place_name, place_id, max_images)
 
 def get_image_path(place_name, place_id=None):
     """Get single image path for a destination (backward compatibility)"""
     images = get_destination_images(place_name, place_id, 1)
     return images[0] if images else None
 
+@st.cache_resource
+def get_api_client():
+    """Pooled keep-alive API client, shared by every session of this server"""
+    return ApiClient(API_BASE_URL)
+
+@st.cache_data(ttl=API_CACHE_TTL, show_spinner=False)
+def fetch_recommendations(params):
+    """GET /recommendations for normalized params; errors raise and are therefore not cached"""
+    return get_api_client().get_json("/recommendations", dict(params))
+
 def get_recommendations_from_api(location=None, min_rating=None, price_category=None, category=None, top_n=10):
-    """Fetch recommendations from API"""
+    """Fetch recommendations from API (memoized per filter combination for API_CACHE_TTL seconds)"""
+    params = normalize_params({
+        "top_n": top_n,
+        "location": location,
+        "min_rating": min_rating or None,
+        "price_category": price_category,
+        "category": category,
+    })
     try:
-        params = {"top_n": top_n}
-        if location:
-            params["location"] = location
-        if min_rating:
-            params["min_rating"] = min_rating
-        if price_category:
-            params["price_category"] = price_category
-        if category:
-            params["category"] = category
-            
-        response = requests.get(f"{API_BASE_URL}/recommendations", params=params, timeout=10)
-        
-        if response.status_code == 200:
-            return response.json()
-        else:
-            st.error(f"API Error: {response.status_code} - {response.text}")
-            return []
-    except requests.exceptions.RequestException as e:
-        st.error(f"❌ Tidak dapat terhubung ke API: {str(e)}")
+        return fetch_recommendations(params)
+    except ApiError as e:
+        st.error(str(e) if e.status_code else f"❌ {e}")
         return []
 
-def display_destination_image(destination_name, destination_id):
+@st.cache_data(ttl=API_CACHE_TTL, show_spinner=False)
+def fetch_recommendation_page(params):
+    """GET one sorted /recommendations page for normalized params as (items, total)"""
+    return get_api_client().get_page("/recommendations", dict(params))
+
+def get_destination_page(location=None, min_rating=None, category=None, sort_by="rating", order="desc", offset=0, limit=24):
+    """Fetch one page of the sorted destination catalog from the API as (destinations, total)"""
+    params = normalize_params({
+        "location": location,
+        "min_rating": min_rating or None,
+        "category": category,
+        "sort_by": sort_by,
+        "order": order,
+        "offset": offset,
+        "limit": limit,
+    })
+    try:
+        return fetch_recommendation_page(params)
+    except ApiError as e:
+        st.error(str(e) if e.status_code else f"❌ {e}")
+        return [], 0
+
+def image_url(path):
+    """Public URL of a file under IMAGE_BASE"""
+    relative = os.path.relpath(path, IMAGE_BASE).replace(os.sep, "/")
+    return f"{IMAGE_BASE_URL}/{quote(relative, safe='/@')}"
+
+def destination_image_html(image_path, alt):
+    """<picture> for a card image referenced by URL, with WebP/JPEG thumbnail srcsets when built"""
+    alt = html.escape(alt or "", quote=True)
+    width, height = CARD_SIZE
+    if not os.path.exists(thumbnail_path(image_path)):
+        return (f'<img class="destination-image" src="{image_url(image_path)}" alt="{alt}" '
+                f'width="{width}" height="{height}" loading="lazy">')
+    
+    sizes = "(max-width: 480px) 280px, (max-width: 768px) 320px, 400px"
+    srcset = lambda fmt: ", ".join(
+        f"{image_url(thumbnail_path(image_path, size, fmt))} {size[0]}w" for size in THUMBNAIL_SIZES
+    )
+    return (
+        f'<picture>'
+        f'<source type="image/webp" srcset="{srcset("webp")}" sizes="{sizes}">'
+        f'<img class="destination-image" src="{image_url(thumbnail_path(image_path))}" '
+        f'srcset="{srcset("jpeg")}" sizes="{sizes}" alt="{alt}" '
+        f'width="{width}" height="{height}" loading="lazy">'
+        f'</picture>'
+    )
+
+def prefetch_destination_images(destinations):
+    """Start loading card images of destinations that are about to be shown"""
+    if not IMAGE_BASE_URL:
+        get_image_loader().prefetch(destinations)
+        return
+    
+    # URL mode: let the browser fetch the thumbnails while idle
+    links = []
+    for destination in destinations:
+        image_path = get_image_path(destination.get("Place_Name", ""), destination.get("Place_Id"))
+        if image_path:
+            thumbnail = thumbnail_path(image_path, fmt="webp")
+            url = image_url(thumbnail if os.path.exists(thumbnail) else image_path)
+            links.append(f'<link rel="prefetch" as="image" href="{url}">')
+    if links:
+        st.markdown("".join(links), unsafe_allow_html=True)
+
+def display_destination_image(destination_name, destination_id, image_bytes=None):
     """Display single main image for destination with consistent sizing"""
+    # Already loaded by the page's batch loader (ImageLoader.load_many)
+    if image_bytes is not None:
+        st.image(image_bytes, use_container_width=True)
+        return
+    
     # Get first image for the destination
     image_path = get_image_path(destination_name, destination_id)
     
-    if image_path and os.path.exists(image_path):
+    # Static URL: the browser fetches (and caches) the image directly from nginx
+    if IMAGE_BASE_URL and image_path:
+        st.markdown(destination_image_html(image_path, destination_name), unsafe_allow_html=True)
+        return
+    
+    # Pre-built 400x200 thumbnail (build_thumbnails.py): stream its bytes without decoding
+    thumbnail = thumbnail_path(image_path) if image_path else None
+    if thumbnail and os.path.exists(thumbnail):
+        st.image(thumbnail, use_container_width=True)
+    elif image_path and os.path.exists(image_path):
         try:
             # Display the image with consistent sizing and city overlay
             with Image.open(image_path) as img:
@@ -391,7 +481,7 @@ def display_destination_image(destination_name, destination_id):
             use_container_width=True
         )
 
-def display_destination_card(destination, col):
+def display_destination_card(destination, col, image_bytes=None):
     """Display a destination card with proper Streamlit components"""
     with col:
         # Create card container with border and styling
@@ -401,7 +491,8 @@ def display_destination_card(destination, col):
             # 1. Display image
             display_destination_image(
                 destination.get("Place_Name", ""), 
-                destination.get("Place_Id")
+                destination.get("Place_Id"),
+                image_bytes
             )
             
             # 2. City badge overlay
@@ -747,13 +838,22 @@ def gallery_page():
             help="Filter berdasarkan rating minimal"
         )
     
-    # Sort options
+    # Sort options (label -> API sort_by, order)
+    sort_options = {
+        "Rating (Tertinggi)": ("rating", "desc"),
+        "Rating (Terendah)": ("rating", "asc"),
+        "Nama (A-Z)": ("name", "asc"),
+        "Nama (Z-A)": ("name", "desc"),
+        "Harga (Terendah)": ("price", "asc"),
+        "Harga (Tertinggi)": ("price", "desc"),
+    }
     col1, col2 = st.columns(2)
     with col1:
-        sort_by = st.selectbox(
+        sort_label = st.selectbox(
             "📊 Urutkan berdasarkan",
-            ["Rating (Tertinggi)", "Rating (Terendah)", "Nama (A-Z)", "Nama (Z-A)", "Harga (Terendah)", "Harga (Tertinggi)"]
+            list(sort_options)
         )
+        sort_by, sort_order = sort_options[sort_label]
     
     with col2:
         per_page = st.selectbox(
@@ -764,38 +864,33 @@ def gallery_page():
     
     st.markdown('</div>', unsafe_allow_html=True)
     
-    # Get all destinations (API has max limit of 50)
+    if 'gallery_page_num' not in st.session_state:
+        st.session_state.gallery_page_num = 1
+    
+    # Back to the first page whenever a filter, the sort or the page size changes
+    gallery_query = (city_filter, category_filter, min_rating, sort_label, per_page)
+    if st.session_state.get('gallery_query') != gallery_query:
+        st.session_state.gallery_query = gallery_query
+        st.session_state.gallery_page_num = 1
+    
+    # Fetch only the current page; sorting and paging happen in the API
     with st.spinner("🔄 Memuat galeri destinasi..."):
-        # Get maximum available destinations from API
-        all_destinations = get_recommendations_from_api(
+        page_destinations, total_destinations = get_destination_page(
             location=city_filter if city_filter else None,
             min_rating=min_rating,
             category=category_filter if category_filter else None,
-            top_n=50  # API maximum limit
+            sort_by=sort_by,
+            order=sort_order,
+            offset=(st.session_state.gallery_page_num - 1) * per_page,
+            limit=per_page
         )
     
-    if all_destinations:
-        # Sort results
-        if sort_by == "Rating (Tertinggi)":
-            all_destinations.sort(key=lambda x: x.get('Rating', 0), reverse=True)
-        elif sort_by == "Rating (Terendah)":
-            all_destinations.sort(key=lambda x: x.get('Rating', 0))
-        elif sort_by == "Nama (A-Z)":
-            all_destinations.sort(key=lambda x: x.get('Place_Name', ''))
-        elif sort_by == "Nama (Z-A)":
-            all_destinations.sort(key=lambda x: x.get('Place_Name', ''), reverse=True)
-        elif sort_by == "Harga (Terendah)":
-            all_destinations.sort(key=lambda x: x.get('Price', 0))
-        elif sort_by == "Harga (Tertinggi)":
-            all_destinations.sort(key=lambda x: x.get('Price', 0), reverse=True)
-        
-        # Pagination
-        total_destinations = len(all_destinations)
-        total_pages = (total_destinations + per_page - 1) // per_page
-        
-        if 'gallery_page_num' not in st.session_state:
-            st.session_state.gallery_page_num = 1
-        
+    total_pages = max(1, (total_destinations + per_page - 1) // per_page)
+    if total_destinations and st.session_state.gallery_page_num > total_pages:
+        st.session_state.gallery_page_num = total_pages
+        st.rerun()
+    
+    if page_destinations:
         # Page navigation
         col1, col2, col3 = st.columns([1, 2, 1])
         with col1:
@@ -816,21 +911,23 @@ def gallery_page():
                 st.session_state.gallery_page_num += 1
                 st.rerun()
         
-        # Calculate slice for current page
-        start_idx = (st.session_state.gallery_page_num - 1) * per_page
-        end_idx = start_idx + per_page
-        page_destinations = all_destinations[start_idx:end_idx]
-        
         # Display destinations
         st.markdown(f"<h3 style='text-align: center; color: #2c3e50; margin: 2rem 0;'>🏛️ Destinasi Halaman {st.session_state.gallery_page_num}</h3>", unsafe_allow_html=True)
         
+        # Load every card image of the page at once on the loader's thread pool
+        # (with IMAGE_BASE_URL the browser fetches them by URL instead)
+        if IMAGE_BASE_URL:
+            page_images = [None] * len(page_destinations)
+        else:
+            page_images = get_image_loader().load_many(page_destinations)
+        
         # Grid layout for gallery page
         cols_per_row = 4
         for i in range(0, len(page_destinations), cols_per_row):
             cols = st.columns(cols_per_row)
             for j, destination in enumerate(page_destinations[i:i+cols_per_row]):
                 if j < len(cols):
-                    display_destination_card(destination, cols[j])
+                    display_destination_card(destination, cols[j], page_images[i + j])
         
         # Bottom pagination
         st.markdown("---")
@@ -857,6 +954,19 @@ def gallery_page():
             if st.button("Selanjutnya ➡️", key="bottom_next", disabled=st.session_state.gallery_page_num >= total_pages):
                 st.session_state.gallery_page_num += 1
                 st.rerun()
+        
+        # Warm the next page after this one is rendered so paging forward is instant
+        if st.session_state.gallery_page_num < total_pages:
+            next_destinations, _ = get_destination_page(
+                location=city_filter if city_filter else None,
+                min_rating=min_rating,
+                category=category_filter if category_filter else None,
+                sort_by=sort_by,
+                order=sort_order,
+                offset=st.session_state.gallery_page_num * per_page,
+                limit=per_page
+            )
+            prefetch_destination_images(next_destinations)
                 
     else:
         st.warning("🔍 Tidak ada destinasi ditemukan dengan kriteria yang dipilih.")
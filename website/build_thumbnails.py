@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Build fixed-size thumbnails for the destination images.
+
+Every original ``NNN_MM.jpg`` gets derivatives next to it, one per size and
+format, e.g. ``NNN_MM@400x200.jpg`` and ``NNN_MM@400x200.webp``:
+
+    400x200   card image (desktop)
+    800x400   card image on 2x displays
+    320x160   card image below 768px (160px high in the CSS)
+    280x140   card image below 480px (140px high in the CSS)
+
+Thumbnails are center-cropped to the exact size (the cards use
+``object-fit: cover``), saved as progressive JPEG and WebP, and only rebuilt
+when missing or older than their original. Work is spread over a process pool.
+
+    python build_thumbnails.py [--root image] [--jobs N] [--formats jpeg webp]
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageOps
+
+THUMBNAIL_SIZES = [(400, 200), (800, 400), (320, 160), (280, 140)]
+CARD_SIZE = (400, 200)
+FORMATS = {
+    "jpeg": (".jpg", {"format": "JPEG", "quality": 82, "optimize": True, "progressive": True}),
+    "webp": (".webp", {"format": "WEBP", "quality": 80, "method": 6}),
+}
+ORIGINAL_EXTENSIONS = (".jpg",)
+
+
+def is_thumbnail(filename):
+    """True for generated derivatives (``name@WxH.ext``)"""
+    return "@" in filename
+
+
+def thumbnail_path(image_path, size=CARD_SIZE, fmt="jpeg"):
+    """Path of an original image's derivative for the given size and format"""
+    base, _ = os.path.splitext(image_path)
+    return f"{base}@{size[0]}x{size[1]}{FORMATS[fmt][0]}"
+
+
+def find_originals(root):
+    """All original images under root, sorted"""
+    originals = []
+    for folder, _, files in os.walk(root):
+        originals.extend(
+            os.path.join(folder, name) for name in files
+            if name.endswith(ORIGINAL_EXTENSIONS) and not is_thumbnail(name)
+        )
+    return sorted(originals)
+
+
+def build_for_image(image_path, sizes=THUMBNAIL_SIZES, formats=("jpeg", "webp"), force=False):
+    """
+    Write the missing or outdated derivatives of one original.
+
+    Returns:
+        tuple: (written, skipped, error message or None)
+    """
+    source_mtime = os.path.getmtime(image_path)
+    targets = [
+        (size, fmt, thumbnail_path(image_path, size, fmt))
+        for size in sizes for fmt in formats
+    ]
+    pending = [
+        target for target in targets
+        if force or not os.path.exists(target[2]) or os.path.getmtime(target[2]) < source_mtime
+    ]
+    if not pending:
+        return 0, len(targets), None
+
+    try:
+        with Image.open(image_path) as img:
+            img = img.convert("RGB")
+            # Decode the original once for all of its derivatives
+            for size, fmt, path in pending:
+                thumbnail = ImageOps.fit(img, size, Image.Resampling.LANCZOS)
+                tmp_path = f"{path}.tmp"
+                thumbnail.save(tmp_path, **FORMATS[fmt][1])
+                os.replace(tmp_path, path)
+    except Exception as e:
+        return 0, len(targets) - len(pending), f"{image_path}: {e}"
+
+    return len(pending), len(targets) - len(pending), None
+
+
+def build_thumbnails(root, jobs=None, formats=("jpeg", "webp"), force=False):
+    """Build thumbnails for every original under root; returns (written, skipped, errors)"""
+    originals = find_originals(root)
+    written = skipped = 0
+    errors = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        results = pool.map(
+            build_for_image, originals,
+            [THUMBNAIL_SIZES] * len(originals), [tuple(formats)] * len(originals), [force] * len(originals),
+            chunksize=16,
+        )
+        for image_written, image_skipped, error in results:
+            written += image_written
+            skipped += image_skipped
+            if error:
+                errors.append(error)
+    return written, skipped, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build thumbnails next to the destination images")
+    parser.add_argument("--root", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "image"))
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--formats", nargs="+", choices=sorted(FORMATS), default=["jpeg", "webp"])
+    parser.add_argument("--force", action="store_true", help="rebuild even if thumbnails are up to date")
+    args = parser.parse_args()
+
+    start = time.time()
+    written, skipped, errors = build_thumbnails(args.root, args.jobs, args.formats, args.force)
+    for error in errors:
+        print(f"Error building thumbnail: {error}")
+    print(f"Thumbnails: {written} written, {skipped} up to date, {len(errors)} failed "
+          f"in {time.time() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
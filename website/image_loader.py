@@ -0,0 +1,139 @@
+"""
+Batch loading of card images for a page of destinations.
+
+A gallery page shows up to 100 cards. Instead of resolving and reading each
+card's image in turn while rendering, the whole page is resolved through the
+image manifest and read on a thread pool at once; file reads and PIL decodes
+release the GIL. Card-sized bytes (the pre-built 400x200 thumbnail, or a
+resized original when no thumbnail exists) are kept in an LRU byte cache,
+and the next page is loaded into it in the background so paging forward is
+served from memory.
+"""
+
+import io
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from build_thumbnails import CARD_SIZE, thumbnail_path
+
+
+class ImageBytesCache:
+    """Thread-safe LRU of image bytes, bounded by total size"""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= len(self._entries.pop(key))
+            self._entries[key] = data
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+
+def card_image_bytes(image_path):
+    """Card-sized JPEG bytes: the pre-built thumbnail as-is, else the original resized once"""
+    thumbnail = thumbnail_path(image_path)
+    if os.path.exists(thumbnail):
+        with open(thumbnail, "rb") as f:
+            return f.read()
+
+    with Image.open(image_path) as img:
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        img = img.resize(CARD_SIZE, Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    img.save(buffer, "JPEG", quality=85)
+    return buffer.getvalue()
+
+
+class ImageLoader:
+    """Resolves and loads card images for whole pages of destinations on a thread pool"""
+
+    def __init__(self, manifest, max_workers=8, cache=None):
+        self.manifest = manifest
+        self.cache = cache or ImageBytesCache()
+        self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix="card-images")
+        self._pending = {}
+        # Re-entrant: a future that is already done runs its callback (_forget) inside _submit
+        self._lock = threading.RLock()
+
+    def image_path(self, destination):
+        """First image of a destination (API record with Place_Name/Place_Id), or None"""
+        paths = self.manifest.paths(destination.get("Place_Name", ""), destination.get("Place_Id"), 1)
+        return paths[0] if paths else None
+
+    def _load(self, path):
+        data = self.cache.get(path)
+        if data is None:
+            try:
+                data = card_image_bytes(path)
+            except Exception as e:
+                print(f"Error loading image {path}: {e}")
+                return None
+            self.cache.put(path, data)
+        return data
+
+    def _submit(self, path):
+        """Future for a path's bytes; a load already running for the path is shared"""
+        with self._lock:
+            future = self._pending.get(path)
+            if future is None:
+                future = self._pool.submit(self._load, path)
+                self._pending[path] = future
+                future.add_done_callback(lambda _, path=path: self._forget(path))
+            return future
+
+    def _forget(self, path):
+        with self._lock:
+            self._pending.pop(path, None)
+
+    def load_many(self, destinations):
+        """
+        Card image bytes for every destination of a page, loaded concurrently.
+
+        Returns:
+            list: bytes or None (no image) per destination, in the same order
+        """
+        images = [None] * len(destinations)
+        futures = {}
+        for i, destination in enumerate(destinations):
+            path = self.image_path(destination)
+            if path is None:
+                continue
+            images[i] = self.cache.get(path)
+            if images[i] is None:
+                futures[i] = self._submit(path)
+        for i, future in futures.items():
+            images[i] = future.result()
+        return images
+
+    def prefetch(self, destinations):
+        """Warm the cache for destinations in the background (returns immediately)"""
+        for destination in destinations:
+            path = self.image_path(destination)
+            if path and path not in self.cache:
+                self._submit(path)
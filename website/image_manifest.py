@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Manifest of the scraped destination images.
+
+The image folder holds one ``{Place_Id:03d}_{Place_Name}`` directory per
+place with ``{Place_Id:03d}_{NN}.jpg`` files inside. The manifest maps every
+Place_Id and normalized folder name to the sorted image files and their
+dimensions, so the app resolves a card's images with a dict lookup instead
+of listing the image directory on every render.
+
+The manifest is read from ``manifest.json`` in the image folder when present
+(written by the scraper and the Docker build), otherwise built by scanning
+the folder once. Regenerate it with:
+    python image_manifest.py [--root image]
+"""
+
+import argparse
+import json
+import os
+
+from PIL import Image
+
+from build_thumbnails import is_thumbnail
+
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_VERSION = 1
+IMAGE_EXTENSIONS = (".jpg",)
+
+
+def normalize_name(name):
+    """Place name as it appears in image folder names (same rule the app always matched on)"""
+    return name.replace(" ", "_").replace("(", "").replace(")", "").lower()
+
+
+def image_size(path):
+    """(width, height) from the image header, or (None, None) if unreadable"""
+    try:
+        with Image.open(path) as img:
+            return img.size
+    except Exception:
+        return None, None
+
+
+def scan_images(root, with_sizes=True):
+    """Scan the image folder into the manifest dict (folder -> place id and image list)"""
+    places = {}
+    with os.scandir(root) as entries:
+        folders = sorted(entry.name for entry in entries if entry.is_dir())
+
+    for folder in folders:
+        prefix = folder.split("_", 1)[0]
+        folder_path = os.path.join(root, folder)
+        files = sorted(
+            name for name in os.listdir(folder_path)
+            if name.endswith(IMAGE_EXTENSIONS) and not is_thumbnail(name)
+        )
+        images = []
+        for name in files:
+            width, height = image_size(os.path.join(folder_path, name)) if with_sizes else (None, None)
+            images.append({"file": name, "width": width, "height": height})
+        places[folder] = {
+            "place_id": int(prefix) if prefix.isdigit() else None,
+            "images": images,
+        }
+    return {"version": MANIFEST_VERSION, "places": places}
+
+
+def write_manifest(root, with_sizes=True):
+    """Scan the image folder and write manifest.json into it"""
+    manifest = scan_images(root, with_sizes)
+    path = os.path.join(root, MANIFEST_FILENAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+class ImageManifest:
+    """Place_Id / normalized name -> sorted image paths and dimensions"""
+
+    def __init__(self, root, manifest):
+        self.root = root
+        self.by_id = {}
+        self.by_name = {}
+        for folder, place in manifest["places"].items():
+            images = [
+                (os.path.join(root, folder, image["file"]), image.get("width"), image.get("height"))
+                for image in place["images"]
+            ]
+            if not images:
+                continue
+            # Folders are sorted, so the first folder for an id wins like the old directory scan
+            if place["place_id"] is not None:
+                self.by_id.setdefault(place["place_id"], images)
+            self.by_name.setdefault(folder.lower(), images)
+            self.by_name.setdefault(folder.split("_", 1)[-1].lower(), images)
+
+    @classmethod
+    def load(cls, root):
+        """Read manifest.json from root, or scan root if there is none (empty if root is missing)"""
+        if not os.path.isdir(root):
+            return cls(root, {"version": MANIFEST_VERSION, "places": {}})
+
+        path = os.path.join(root, MANIFEST_FILENAME)
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    manifest = json.load(f)
+                if manifest.get("version") == MANIFEST_VERSION:
+                    return cls(root, manifest)
+            except (OSError, ValueError) as e:
+                print(f"Error reading image manifest {path}: {e}")
+
+        # No usable manifest: a scan without reading image headers keeps startup fast
+        return cls(root, scan_images(root, with_sizes=False))
+
+    def images(self, place_name, place_id=None, max_images=5):
+        """
+        Image entries for a destination, by Place_Id first and then by name.
+
+        Returns:
+            list: (path, width, height) tuples, at most max_images
+        """
+        images = self.by_id.get(place_id) if place_id else None
+        if not images and place_name:
+            name = normalize_name(place_name)
+            images = self.by_name.get(name)
+            if images is None:
+                # Rare: partial name match, over the in-memory folder names only
+                images = next((found for key, found in self.by_name.items() if name in key), None)
+        return (images or [])[:max_images]
+
+    def paths(self, place_name, place_id=None, max_images=5):
+        """Image file paths for a destination"""
+        return [path for path, _, _ in self.images(place_name, place_id, max_images)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write manifest.json for the destination image folder")
+    parser.add_argument("--root", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "image"))
+    parser.add_argument("--no-sizes", action="store_true", help="skip reading image dimensions")
+    args = parser.parse_args()
+
+    path = write_manifest(args.root, with_sizes=not args.no_sizes)
+    print(f"Image manifest written to {path}")
+
+
+if __name__ == "__main__":
+    main()